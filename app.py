@@ -1,126 +1,309 @@
-from flask import Flask, request, jsonify, render_template
-import sqlalchemy
+from flask import Flask, Response, request, jsonify, render_template
 import logging
-import pickle
 import json
-from sqlalchemy.sql import text
+import itertools
+import os
+import numpy as np
+from db import create_engine, INSERT_QUOTE_QUERY, DB_STATEMENT_TIMEOUT_MS
+from catalog import ComponentCatalog, COMPONENT_TYPES
+from catalog_store import heartbeat_age
+from solver import solve_builds, BuildInfeasibleError
+from model_store import ModelStore, MODEL_DIR
+from cache import TTLCache
+from quote_writer import QuoteWriter
+from metrics import metrics, profiled
+from tiers import TierStore, build_tier_table, TIER_START, TIER_STOP, TIER_STEP, TIER_TOP_K
 
 app = Flask(__name__)
 
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s')
 
-# 데이터베이스 연결 설정
-DATABASE_URL = "postgresql://<user>:<password>@<host>/<database>"
-engine = sqlalchemy.create_engine(DATABASE_URL)
-
-def get_db_connection():
-    """데이터베이스 연결을 생성하고 반환"""
-    return engine.connect()
-
-def get_component_info(componentid):
-    """특정 componentid에 해당하는 부품 정보를 반환"""
-    conn = get_db_connection()
-    query = text("SELECT name, price, type FROM components WHERE componentid = :componentid")
-    info = conn.execute(query, {"componentid": componentid}).fetchone()
-    conn.close()
-    return info
-
-def get_random_components(type, count=5):
-    """특정 타입의 부품을 랜덤하게 선택하여 반환"""
-    conn = get_db_connection()
-    query = text("SELECT componentid FROM components WHERE type = :type ORDER BY RANDOM() LIMIT :count")
-    components = conn.execute(query, {"type": type, "count": count}).fetchall()
-    conn.close()
-    return components
-
-# 모델과 라벨 인코더 로드
-with open('pc_build_model.pkl', 'rb') as f:
-    model, le_dict = pickle.load(f)
-
-def recommend_components(budget):
-    """사용자의 예산에 맞춰 부품을 추천하는 함수"""
-    components = ["CPU", "GPU", "RAM", "Storage", "PSU", "Case", "Motherboard"]
+# 요청을 처리하는 연결에만 statement_timeout을 거는 웹 전용 엔진
+engine = create_engine(statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS)
+
+# 요청별 쿼리 수/시간 계측 (/metrics)
+metrics.instrument_engine(engine)
+
+# 부품 카탈로그 (components 테이블의 메모리 스냅샷)
+# 주기마다 catalog_versions만 확인하고, 버전이 바뀐 타입만 다시 읽는다.
+# CATALOG_SHARED_DIR가 설정되면(gunicorn.conf.py) 로더 프로세스가 게시한
+# 공유 스냅샷을 mmap으로 열고, 주기마다 새 버전이 게시되었는지만 확인한다.
+CATALOG_REFRESH_INTERVAL = 60  # 초
+CATALOG_SHARED_DIR = os.environ.get('CATALOG_SHARED_DIR')
+catalog = ComponentCatalog(engine, refresh_interval=CATALOG_REFRESH_INTERVAL, shared_root=CATALOG_SHARED_DIR)
+catalog.start_auto_refresh()
+if CATALOG_SHARED_DIR:
+    # 로더가 멈추면 스냅샷이 조용히 낡으므로 두 나이를 함께 내보낸다
+    metrics.gauge('catalog_loader_heartbeat_age_seconds', lambda: heartbeat_age(CATALOG_SHARED_DIR))
+    metrics.gauge('catalog_snapshot_age_seconds', catalog.shared_age)
+
+# 부품 교체 추천 캐시: (타입, 예산 구간) → 구간 안에서 가장 비싼 후보 목록
+# 카탈로그에서 타입이 바뀌면 그 타입의 항목만 버린다.
+BUDGET_BUCKET = 10000  # 원
+COMPONENT_CANDIDATES = 10
+COMPONENT_CACHE_SIZE = 1024
+COMPONENT_CACHE_TTL = 300  # 초
+component_cache = TTLCache(COMPONENT_CACHE_SIZE, COMPONENT_CACHE_TTL)
+catalog.add_listener(lambda changed: component_cache.invalidate(lambda key: key[0] in changed))
+
+def get_component_candidates(type, budget):
+    """예산을 BUDGET_BUCKET 단위로 내린 가격 이하에서 가장 비싼 후보 목록과 순환 카운터를 반환"""
+    bucket = int(budget // BUDGET_BUCKET)
+
+    def build():
+        affordable = catalog.of_type(type).affordable(bucket * BUDGET_BUCKET)
+        return tuple(reversed(affordable[-COMPONENT_CANDIDATES:])), itertools.count()
+
+    return component_cache.get_or_set((type, bucket), build)
+
+def suggest_component(type, budget):
+    """예산 이하의 교체 부품 하나를 반환 (같은 구간의 요청은 후보 목록을 돌아가며 반환)"""
+    candidates, turn = get_component_candidates(type, budget)
+    if not candidates:
+        # 구간 하한 이하에는 부품이 없을 때만 실제 예산으로 직접 고른다.
+        affordable = catalog.of_type(type).affordable(budget)
+        return affordable[-1] if affordable else None
+    return candidates[next(turn) % len(candidates)]
+
+# 모델과 라벨 인코더 저장소 (첫 요청 때 읽고, 새 버전이 게시되면 자동 교체)
+MODEL_CHECK_INTERVAL = 30  # 초
+model_store = ModelStore(MODEL_DIR, check_interval=MODEL_CHECK_INTERVAL)
+
+# 배치 추천 한 번에 받을 수 있는 최대 예산 개수. 구간 표를 쓸 수 없으면 예산마다
+# 직접 계산(부품 10만 개에서 약 40ms)하므로, 그때도 1초 안에 끝나는 개수로 제한한다.
+MAX_BATCH_BUDGETS = 20
+
+# 모델로 순위를 매길 후보 조합 수 (예산 내 지출이 큰 순으로 생성)와 top_k 상한
+CANDIDATE_BUILDS = 50
+MAX_TOP_K = 20
+
+def solve_recommendation(budget, encoders, objective=None, max_prices=None, snapshot=None, count=1):
+    """예산에 맞는 부품 조합을 최대 count개 구해 ([(조합, 총 가격), ...], 모델 입력 행렬)을 반환
+
+    예산 내에서 타입별로 하나씩 고른 서로 호환되는 조합 중 objective(기본: 총 가격)가
+    큰 순으로 찾는다. max_prices({타입: 상한})로 타입별 가격 상한을 둘 수 있다.
+    encoders({타입: CompiledEncoder})에 없는 부품이 섞여 모델 입력을 만들 수 없으면
+    모델 입력은 None이다.
+    조합이 불가능하면 BuildInfeasibleError를 발생시킨다.
+    """
+    snapshot = snapshot or catalog.snapshot()
+    max_prices = max_prices or {}
+    with metrics.stage('candidates'):
+        candidates = {
+            component: snapshot.of_type(component).affordable(min(budget, max_prices.get(component, budget)))
+            for component in COMPONENT_TYPES
+        }
+        # 모델 입력으로 쓸 수 있도록 학습 데이터에 등장한 부품만으로 먼저 구성
+        known = {
+            component: items.take(np.flatnonzero(encoders[component].known(items.ids)))
+            if component in encoders else items.take([])
+            for component, items in candidates.items()
+        }
+
+    try:
+        with metrics.stage('solve'):
+            builds = solve_builds(known, budget, objective, snapshot.compatibility, count)
+        with metrics.stage('encode'):
+            inputs = np.array([
+                [encoders[component].encode(build[component].id) for component in COMPONENT_TYPES]
+                for build, _ in builds
+            ])
+    except BuildInfeasibleError as e:
+        logging.debug(f"Known-component build infeasible, falling back to full catalog: {e}")
+        metrics.incr('recommend_fallback_total')
+        with metrics.stage('fallback'):
+            builds = solve_builds(candidates, budget, objective, snapshot.compatibility, count)
+        inputs = None
+    return builds, inputs
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def request_error(item):
+    """추천 요청 항목({"budget": 예산, "max_prices": {타입: 상한}})이 잘못되었으면 오류 메시지를 반환"""
+    if not _is_number(item.get('budget')):
+        return "budget must be a number"
+    max_prices = item.get('max_prices')
+    if max_prices is None:
+        return None
+    if not isinstance(max_prices, dict):
+        return "max_prices must be an object mapping component type to price"
+    for component, price in max_prices.items():
+        if component not in COMPONENT_TYPES:
+            return f"Unknown component type in max_prices: {component}"
+        if not _is_number(price):
+            return f"max_prices[{component}] must be a number"
+    return None
+
+def score_inputs(model, inputs):
+    """인코딩된 조합 행렬의 모델 점수 (이전 형식 sklearn 모델은 predict_proba의 행별 최댓값)"""
+    if hasattr(model, 'score_builds'):
+        return model.score_builds(inputs)
+    return model.predict_proba(inputs).max(axis=1)
+
+def rank_builds(model, builds, inputs, top_k):
+    """후보 조합을 모델 점수가 높은 순으로 top_k개 골라 [(조합, 총 가격, 점수), ...]로 반환
+
+    모든 후보의 입력을 한 번의 predict_proba로 평가하고, 조합의 점수는 가장
+    비슷한 확정 견적의 확률(행별 최댓값)로 본다. 점수가 같으면 솔버 순서(지출이
+    큰 순)를 유지한다. 모델 입력이 없으면(폴백) 솔버 순서 그대로 점수 None.
+    저장소의 모델(ForestModel, CooccurrenceModel)은 각자의 score_builds를 쓴다.
+    """
+    if inputs is None:
+        return [(build, total_price, None) for build, total_price in builds[:top_k]]
+    with metrics.stage('predict'):
+        scores = score_inputs(model, inputs)
+    return order_by_score(builds, scores, top_k)
+
+def order_by_score(builds, scores, top_k):
+    """점수가 높은 순(같으면 솔버 순서)으로 top_k개의 [(조합, 총 가격, 점수), ...]"""
+    order = np.argsort(-scores, kind='stable')[:top_k]
+    return [(builds[i][0], builds[i][1], float(scores[i])) for i in order]
+
+def format_recommendation(build, total_price):
+    """부품 조합을 응답 형식의 딕셔너리로 변환"""
     recommendation = {}
-    total_price = 0
-    complete = False
+    for component in COMPONENT_TYPES:
+        comp = build[component]
+        recommendation[component] = {"name": comp.name, "price": comp.price, "id": comp.id}
+    recommendation["Total Price"] = total_price
+    return recommendation
+
+def recommend_components(budget, objective=None, max_prices=None, top_k=1):
+    """사용자의 예산에 맞춰 부품 조합을 추천하는 함수
+
+    예산 내 후보 조합을 CANDIDATE_BUILDS개 만들어 모델로 순위를 매긴 뒤
+    상위 top_k개를 [(조합, 총 가격, 점수), ...]로 반환한다.
+    """
+    current = model_store.get()
+    builds, inputs = solve_recommendation(
+        budget, current.encoders, objective, max_prices, count=max(CANDIDATE_BUILDS, top_k)
+    )
+    ranked = rank_builds(current.model, builds, inputs, top_k)
+    logging.debug(f"{'' if inputs is not None else 'Fallback '}Recommendation: "
+                  f"{[format_recommendation(build, total_price) for build, total_price, _ in ranked]}")
+    return ranked
+
+def recommend_components_batch(requests, objective=None):
+    """여러 예산에 대한 추천을 한 번에 계산
 
-    while not complete:
-        recommendation = {}
-        total_price = 0
+    requests는 {"budget": 예산, "max_prices": {...}} 목록이다. max_prices가 없는
+    예산은 /recommend와 같이 구간 표에서 답한다. 나머지(또는 표를 쓸 수 없을
+    때)는 같은 카탈로그 스냅샷에서 예산마다 후보 조합을 CANDIDATE_BUILDS개 만든
+    뒤 모든 후보의 모델 점수를 한 번에 계산해 예산별로 가장 점수가 높은 조합을
+    고른다 (점수는 "Score", 폴백 조합은 점수 없음).
+    조합이 불가능한 예산은 해당 위치에 {"error": ...}를 반환한다.
+    """
+    snapshot = catalog.snapshot()
+    current = model_store.get()
+    results = []
+    solved = []  # (결과 위치, 후보 조합, 입력 행렬에서의 시작 위치)
+    inputs = []
+    offset = 0
+    for item in requests:
+        ranked = None if item.get("max_prices") else recommend_from_tiers(item["budget"])
+        if ranked is not None:
+            metrics.incr('recommend_tier_hits_total')
+            build, total_price, score = ranked[0]
+            results.append(format_recommendation(build, total_price))
+            if score is not None:
+                results[-1]["Score"] = score
+            continue
         try:
-            input_data = [0] * len(components)
-            for i, component in enumerate(components):
-                random_components = get_random_components(component)
-                for comp in random_components:
-                    info = get_component_info(comp[0])
-                    if info and total_price + float(info[1]) <= budget:
-                        try:
-                            encoded_value = le_dict[component].transform([str(comp[0])])[0]
-                            if encoded_value in le_dict[component].classes_:
-                                input_data[i] = encoded_value
-                                total_price += float(info[1])
-                                break
-                        except ValueError as e:
-                            logging.error(e)
-                            continue
-
-            # 예산 내에서 부품을 찾지 못할 경우 예외 처리
-            for i, component in enumerate(components):
-                if input_data[i] not in le_dict[component].classes_:
-                    raise ValueError(f"Unseen label {input_data[i]} for component {component}")
-
-            predicted_index = model.predict([input_data])[0]
-            total_price = 0
-            for i, component in enumerate(components):
-                component_id = le_dict[component].inverse_transform([input_data[i]])[0]
-                info = get_component_info(component_id)
-                if info:
-                    name, price, type_ = info
-                    recommendation[component] = {"name": name, "price": float(price), "id": component_id}
-                    total_price += float(price)
-
-            if total_price > budget:
-                raise ValueError("Total price exceeds budget")
-
-            if len(recommendation) == 7:
-                complete = True
-
-            recommendation["Total Price"] = total_price
-            logging.debug(f"Recommendation: {recommendation}")
-        except Exception as e:
-            logging.error(f"Error: {e}")
-            recommendation = {}
-            total_price = 0
-            for component in components:
-                random_components = get_random_components(component)
-                selected_component = None
-                max_price_within_budget = 0
-                for comp in random_components:
-                    info = get_component_info(comp[0])
-                    if info and total_price + float(info[1]) <= budget and float(info[1]) > max_price_within_budget:
-                        selected_component = comp
-                        max_price_within_budget = float(info[1])
-                if selected_component:
-                    info = get_component_info(selected_component[0])
-                    name, price, type_ = info
-                    recommendation[component] = {"name": name, "price": float(price), "id": selected_component[0]}
-                    total_price += float(price)
-
-            if len(recommendation) == 7:
-                complete = True
-
-            recommendation["Total Price"] = total_price
-            logging.debug(f"Fallback Recommendation: {recommendation}")
+            builds, build_inputs = solve_recommendation(
+                item["budget"], current.encoders, objective, item.get("max_prices"), snapshot,
+                count=CANDIDATE_BUILDS,
+            )
+        except BuildInfeasibleError as e:
+            results.append({"error": str(e)})
+            continue
+        if build_inputs is None:
+            results.append(format_recommendation(*builds[0]))
+            continue
+        results.append(None)
+        solved.append((len(results) - 1, builds, offset))
+        inputs.append(build_inputs)
+        offset += len(build_inputs)
 
-    return recommendation
+    if inputs:
+        with metrics.stage('predict'):
+            scores = score_inputs(current.model, np.concatenate(inputs))
+        for position, builds, start in solved:
+            (build, total_price, score), = order_by_score(builds, scores[start:start + len(builds)], 1)
+            results[position] = format_recommendation(build, total_price)
+            results[position]["Score"] = score
+    return results
+
+# 예산 구간별로 미리 계산한 추천 조합 표
+# 표는 작업 프로세스 밖(python tiers.py --watch)에서 카탈로그가 갱신되거나 모델 버전이
+# 바뀔 때마다 다시 만들고, 서비스는 파일을 다시 읽기만 한다. 표가 오래되었으면 직접 계산한다.
+def build_tiers(start=TIER_START, stop=TIER_STOP, step=TIER_STEP, top_k=TIER_TOP_K):
+    """현재 카탈로그와 모델로 예산 구간 표를 만듦"""
+    current = model_store.get()
+    snapshot = catalog.snapshot()
+    return build_tier_table(
+        lambda budget, k: recommend_components(budget, top_k=k), start, stop, step, top_k,
+        model_version=current.version, catalog_digest=catalog_digest(snapshot),
+    )
+
+_digest = (None, None)  # (스냅샷, 내용 해시): 스냅샷이 바뀔 때만 다시 계산
+
+def catalog_digest(snapshot):
+    global _digest
+    cached_snapshot, digest = _digest
+    if cached_snapshot is not snapshot:
+        digest = snapshot.digest()
+        _digest = (snapshot, digest)
+    return digest
+
+def tiers_fresh(table):
+    """표가 현재 모델 버전과 같은 내용(부품 ID와 가격)의 카탈로그로 만들어졌는지
+
+    표에 해시가 없으면(이전 형식) 오래된 것으로 본다.
+    """
+    return (table.catalog_digest is not None
+            and table.model_version == model_store.get().version
+            and table.catalog_digest == catalog_digest(catalog.snapshot()))
+
+tier_store = TierStore()
+tier_store.load()
+
+def recommend_from_tiers(budget, top_k=1):
+    """구간 표에서 budget 이하의 가장 가까운 구간의 조합을 반환 (쓸 수 없으면 None)
+
+    표가 없거나 오래되었으면 None을 반환한다. 총 가격은 현재 스냅샷의 가격으로
+    다시 계산하고, 그 사이 가격이 올라 예산을 넘는 조합이 있으면 None을 반환해
+    직접 계산하게 한다.
+    """
+    table = tier_store.get()
+    if table is None or not tiers_fresh(table):
+        return None
+    if top_k > table.ids.shape[1]:
+        return None
+    ranked = []
+    snapshot = catalog.snapshot()
+    for ids, _, score in table.lookup(budget, top_k):
+        build = {component: snapshot.by_id.get(componentid) for component, componentid in ids.items()}
+        if any(comp is None for comp in build.values()):
+            return None
+        total_price = sum(comp.price for comp in build.values())
+        if total_price > budget:
+            return None
+        ranked.append((build, total_price, score))
+    return ranked or None
+
+# 확정 견적 write-behind 저장 (시퀀스가 있는 PostgreSQL에서만 사용)
+quote_writer = QuoteWriter(engine) if engine.dialect.name == 'postgresql' else None
+if quote_writer is not None:
+    metrics.gauge('quote_writer_pending', quote_writer.pending_count)
 
 def save_confirmed_quote(components):
-    """확정된 견적을 데이터베이스에 저장하고 견적 ID를 반환"""
-    conn = get_db_connection()
-    query = text("INSERT INTO confirmed_quotes (components) VALUES (:components) RETURNING quoteid")
-    quoteid = conn.execute(query, {"components": json.dumps(components)}).fetchone()[0]
-    conn.close()
+    """확정된 견적을 저장 큐에 넣고(또는 바로 저장하고) 견적 ID를 반환"""
+    if quote_writer is not None:
+        return quote_writer.submit(components)
+    with engine.begin() as conn:
+        quoteid = conn.execute(INSERT_QUOTE_QUERY, {"components": json.dumps(components)}).fetchone()[0]
     return quoteid
 
 @app.route('/')
@@ -132,12 +315,69 @@ def index():
 def recommend():
     """추천 요청을 처리하여 부품 조합을 반환"""
     data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    error = request_error(data)
+    if error:
+        return jsonify({"error": error}), 400
     budget = data['budget']
+    # max_prices({타입: 상한})로 타입별 가격 상한을 둘 수 있다
+    max_prices = data.get('max_prices')
+    # top_k를 주면 모델 점수 상위 top_k개 조합을 목록으로 반환
+    top_k = data.get('top_k')
+    # refine이 참이면 구간 표를 쓰지 않고 요청 예산으로 직접 계산 (max_prices가 있어도 직접 계산)
+    refine = bool(data.get('refine')) or bool(max_prices)
+    if top_k is not None and (not isinstance(top_k, int) or not 1 <= top_k <= MAX_TOP_K):
+        return jsonify({"error": f"top_k must be an integer between 1 and {MAX_TOP_K}"}), 400
 
     logging.debug(f"Budget: {budget}")
 
-    recommendation = recommend_components(budget)
-    return jsonify(recommendation)
+    with profiled(request.headers.get('X-Profile') == '1', 'recommend'), metrics.request('recommend', budget):
+        ranked = None if refine else recommend_from_tiers(budget, top_k or 1)
+        if ranked is not None:
+            metrics.incr('recommend_tier_hits_total')
+        try:
+            ranked = ranked or recommend_components(budget, max_prices=max_prices, top_k=top_k or 1)
+        except BuildInfeasibleError as e:
+            metrics.incr('recommend_infeasible_total')
+            return jsonify({"error": str(e)}), 400
+    if top_k is None:
+        build, total_price, _ = ranked[0]
+        return jsonify(format_recommendation(build, total_price))
+    recommendations = []
+    for build, total_price, score in ranked:
+        recommendation = format_recommendation(build, total_price)
+        recommendation["Score"] = score
+        recommendations.append(recommendation)
+    return jsonify({"recommendations": recommendations})
+
+@app.route('/recommend/batch', methods=['POST'])
+def recommend_batch():
+    """여러 예산(가격대)에 대한 추천을 한 번에 반환
+
+    요청 형식: {"budgets": [예산 또는 {"budget": 예산, "max_prices": {타입: 상한}}, ...]}
+    응답의 "recommendations"는 요청과 같은 순서이다.
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    budgets = data.get('budgets')
+    if not isinstance(budgets, list) or not budgets:
+        return jsonify({"error": "budgets must be a non-empty list"}), 400
+    if len(budgets) > MAX_BATCH_BUDGETS:
+        return jsonify({"error": f"At most {MAX_BATCH_BUDGETS} budgets per request"}), 400
+
+    requests = [item if isinstance(item, dict) else {"budget": item} for item in budgets]
+    for position, item in enumerate(requests):
+        error = request_error(item)
+        if error:
+            return jsonify({"error": f"budgets[{position}]: {error}"}), 400
+
+    logging.debug(f"Batch budgets: {len(requests)}")
+
+    with profiled(request.headers.get('X-Profile') == '1', 'recommend_batch'), metrics.request('recommend_batch'):
+        recommendations = recommend_components_batch(requests)
+    return jsonify({"recommendations": recommendations})
 
 @app.route('/confirm', methods=['POST'])
 def confirm_quote():
@@ -146,6 +386,23 @@ def confirm_quote():
     quoteid = save_confirmed_quote(components)
     return jsonify({"quoteid": quoteid, "status": "confirmed"})
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """계측 값을 Prometheus 텍스트 형식으로 반환"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/catalog/refresh', methods=['POST'])
+def refresh_catalog():
+    """부품 카탈로그 스냅샷을 즉시 갱신"""
+    catalog.refresh()
+    return jsonify({"status": "refreshed"})
+
+@app.route('/model/reload', methods=['POST'])
+def reload_model():
+    """게시된 최신 모델을 즉시 다시 읽음"""
+    loaded = model_store.reload()
+    return jsonify({"status": "reloaded", "version": loaded.version})
+
 @app.route('/recommend_component', methods=['GET'])
 def recommend_component():
     """사용자가 부품을 교체할 때 새로운 부품을 추천"""
@@ -155,20 +412,11 @@ def recommend_component():
     if not component_type:
         return jsonify({"error": "Component type is required"}), 400
     
-    random_components = get_random_components(component_type)
-    selected_component = None
-    max_price_within_budget = 0
-    
-    for comp in random_components:
-        info = get_component_info(comp[0])
-        if info and float(info[1]) <= budget and float(info[1]) > max_price_within_budget:
-            selected_component = comp
-            max_price_within_budget = float(info[1])
-    
+    with metrics.request('recommend_component', budget):
+        selected_component = suggest_component(component_type, budget)
+
     if selected_component:
-        info = get_component_info(selected_component[0])
-        name, price, type_ = info
-        component = {"name": name, "price": float(price), "id": selected_component[0]}
+        component = {"name": selected_component.name, "price": selected_component.price, "id": selected_component.id}
         return jsonify({component_type: component})
     else:
         return jsonify({"error": "No suitable component found"}), 404
@@ -0,0 +1,124 @@
+"""스펙 추출 엔진 벤치마크
+
+저장해 둔 목록 텍스트 코퍼스(fixtures/spec_corpus.json)에 대해
+    legacy    필드마다 re.search(문자열 패턴) (기존 스크래퍼 방식, re 캐시 조회)
+    combined  모든 필드를 교대(|) 패턴 하나로 합쳐 한 번 훑기 (검색만, 값 처리 제외)
+    compiled  SpecExtractor.extract (필드별 컴파일된 패턴)
+의 스펙 문자열 하나당 시간을 비교하고, legacy와 compiled의 결과가 같은지 확인한다.
+
+    python benchmarks/bench_extraction.py --repeat 2000
+"""
+import os
+import sys
+import re
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import get_CPUinfo
+import get_GPUinfo
+import get_RAMinfo
+import get_Storageinfo
+import get_PSUinfo
+import get_Caseinfo
+import get_Motherboardinfo
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'spec_corpus.json')
+
+# 카테고리 → (parse_product, [(추출기, 입력 텍스트 클래스)])
+CATEGORIES = {
+    'CPU': (get_CPUinfo.parse_product, [(get_CPUinfo.CPU_SPEC, 'spec_list')]),
+    'GPU': (get_GPUinfo.parse_product, [(get_GPUinfo.NAME_SPEC, 'prod_name'), (get_GPUinfo.GPU_SPEC, 'spec_list')]),
+    'RAM': (get_RAMinfo.parse_product, [(get_RAMinfo.RAM_SPEC, 'spec_list'), (get_RAMinfo.PRICE_LIST, 'prod_pricelist')]),
+    'Storage': (get_Storageinfo.parse_product, [(get_Storageinfo.STORAGE_SPEC, 'spec_list'),
+                                               (get_Storageinfo.PRICE_LIST, 'prod_pricelist')]),
+    'PSU': (get_PSUinfo.parse_product, [(get_PSUinfo.PSU_SPEC, 'spec_list')]),
+    'Case': (get_Caseinfo.parse_product, [(get_Caseinfo.CASE_SPEC, 'spec_list')]),
+    'Motherboard': (get_Motherboardinfo.parse_product, [(get_Motherboardinfo.MOTHERBOARD_SPEC, 'spec_list')]),
+}
+
+
+class FixtureProduct:
+    """코퍼스 항목 하나를 parse_product의 추출 인터페이스로 감싼 객체"""
+
+    def __init__(self, item):
+        self.item = item
+
+    def text(self, class_name):
+        if class_name not in self.item:
+            raise LookupError(f"'{class_name}' 요소를 찾을 수 없습니다.")
+        return self.item[class_name]
+
+
+def legacy_extract(extractor, text):
+    """기존 스크래퍼처럼 필드마다 문자열 패턴으로 검색해 같은 결과를 만든다"""
+    result = {}
+    for field, (_, _, groups, _, _, _) in zip(extractor.fields, extractor.plan):
+        if field.many:
+            value = [match.group(*groups) for match in re.finditer(field.pattern, text)] or None
+        else:
+            match = re.search(field.pattern, text)
+            value = match.group(*groups) if match else None
+        if value is None:
+            result[field.name] = field.default
+        else:
+            result[field.name] = field.convert(value) if field.convert else value
+    return result
+
+
+def combined_scanner(extractor):
+    """모든 필드를 교대 패턴 하나로 합쳐 한 번 훑는 함수 (비교용)"""
+    pattern = re.compile('|'.join(f"(?:{field.pattern})" for field in extractor.fields))
+    return lambda text: pattern.findall(text)
+
+
+def load_cases(corpus):
+    cases = []
+    for item in corpus:
+        for extractor, class_name in CATEGORIES[item['category']][1]:
+            cases.append((extractor, item[class_name]))
+    return cases
+
+
+def timed(function, cases, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for extractor, text in cases:
+            function(extractor, text)
+    return (time.perf_counter() - start) / (repeat * len(cases)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스펙 추출 엔진 벤치마크")
+    parser.add_argument('--corpus', default=CORPUS_PATH, help="코퍼스 JSON 파일")
+    parser.add_argument('--repeat', type=int, default=2000, help="코퍼스 반복 횟수")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding='utf-8') as f:
+        corpus = json.load(f)
+    cases = load_cases(corpus)
+
+    mismatches = 0
+    for extractor, text in cases:
+        if extractor.extract(text) != legacy_extract(extractor, text):
+            mismatches += 1
+            print("결과 불일치:", text)
+    rows = sum(len(CATEGORIES[item['category']][0](FixtureProduct(item))) for item in corpus)
+    print(f"코퍼스 {len(corpus)}개 제품, 스펙 문자열 {len(cases)}개, 추출 행 {rows}개, 불일치 {mismatches}개")
+
+    scanners = {id(extractor): combined_scanner(extractor) for extractor, _ in cases}
+    results = [
+        ('legacy', timed(legacy_extract, cases, args.repeat)),
+        ('combined', timed(lambda extractor, text: scanners[id(extractor)](text), cases, args.repeat)),
+        ('compiled', timed(lambda extractor, text: extractor.extract(text), cases, args.repeat)),
+    ]
+    for name, micros in results:
+        print(f"{name:>9}: 스펙 문자열당 {micros:.2f}us")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""추천 모델 비교 벤치마크 (포레스트 vs 동시 등장 모델)
+
+합성 견적(인기 조합 몇 개를 조금씩 바꾼 견적)을 견적 수별로 만들어
+    fit      학습 시간
+    size     저장되는 배열 크기
+    score    후보 조합 CANDIDATES개 / 1개 점수 계산 지연 시간 (p50)
+    auc      따로 만든 실제형 견적과 무작위 조합을 점수로 구분하는 정도
+를 잰다. 포레스트는 sklearn이 학습 중 트리마다 (노드 수 × 견적 수) 배열을
+만들어 견적 수의 제곱으로 메모리가 늘기 때문에 --forest-max 이하에서만 학습한다.
+
+    python benchmarks/bench_models.py --sizes 10000,100000,1000000
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sklearn.ensemble import RandomForestClassifier
+from model_store import ForestModel, CooccurrenceModel, FOREST_ARRAYS
+
+# 슬롯(COMPONENT_TYPES 순서)별 부품 코드 수
+SLOT_SIZES = [300, 400, 200, 300, 200, 200, 300]
+TEMPLATES = 500  # 인기 조합 수
+MUTATION = 0.3  # 견적마다 슬롯 하나가 인기 조합과 다른 부품으로 바뀔 확률
+CANDIDATES = 50  # app.CANDIDATE_BUILDS와 같은 후보 조합 수
+HELD_OUT = 1000
+
+
+def make_quotes(n, rng, templates):
+    """인기 조합을 바탕으로 인코딩된 견적 n개를 만듦"""
+    X = templates[rng.integers(len(templates), size=n)].copy()
+    for j, size in enumerate(SLOT_SIZES):
+        mutate = rng.random(n) < MUTATION
+        X[mutate, j] = rng.integers(size, size=mutate.sum())
+    return X
+
+
+def random_builds(n, rng):
+    return np.stack([rng.integers(size, size=n) for size in SLOT_SIZES], axis=1)
+
+
+def auc(positive, negative):
+    """positive 점수가 negative 점수보다 클 확률 (같으면 절반)"""
+    scores = np.concatenate([positive, negative])
+    ranks = np.empty(len(scores))
+    order = np.argsort(scores, kind='stable')
+    ranks[order] = np.arange(1, len(scores) + 1)
+    # 같은 점수는 평균 순위
+    unique, inverse = np.unique(scores, return_inverse=True)
+    ranks = (np.bincount(inverse, weights=ranks) / np.bincount(inverse))[inverse]
+    n_pos = len(positive)
+    return (ranks[:n_pos].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * len(negative))
+
+
+def latency(score, X, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score(X)
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def fit_forest(X, trees):
+    with warnings.catch_warnings():
+        # 견적마다 클래스가 하나라 sklearn이 매 트리마다 경고를 낸다
+        warnings.simplefilter('ignore', UserWarning)
+        model = RandomForestClassifier(n_estimators=trees, random_state=42)
+        model.fit(X, np.arange(len(X)))
+    return ForestModel.from_sklearn(model)
+
+
+def run(kind, n, args, rng, templates):
+    X = make_quotes(n, rng, templates)
+    start = time.perf_counter()
+    if kind == 'forest':
+        model = fit_forest(X, args.forest_trees)
+        nbytes = sum(getattr(model, name).nbytes for name in FOREST_ARRAYS)
+    else:
+        model = CooccurrenceModel.fit(X, SLOT_SIZES)
+        nbytes = model.nbytes
+    fit_seconds = time.perf_counter() - start
+
+    candidates = random_builds(CANDIDATES, rng)
+    real, fake = make_quotes(HELD_OUT, rng, templates), random_builds(HELD_OUT, rng)
+    return {
+        "fit_s": fit_seconds,
+        "size_mb": nbytes / 2**20,
+        "batch_ms": latency(model.score_builds, candidates, args.repeat),
+        "single_ms": latency(model.score_builds, candidates[:1], args.repeat),
+        "auc": auc(model.score_builds(real), model.score_builds(fake)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 모델 비교 벤치마크")
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000', help="견적 수 목록 (쉼표 구분)")
+    parser.add_argument('--forest-max', type=int, default=2000, help="포레스트를 학습할 최대 견적 수")
+    parser.add_argument('--forest-trees', type=int, default=100, help="포레스트 트리 수 (train_model과 같음)")
+    parser.add_argument('--repeat', type=int, default=200, help="지연 시간 측정 반복 횟수")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    templates = random_builds(TEMPLATES, rng)
+    print(f"{'model':>13} {'quotes':>8} {'fit':>9} {'size':>10} {CANDIDATES:>4}개 점수 {'1개 점수':>9} {'auc':>6}")
+    for n in (int(size) for size in args.sizes.split(',')):
+        for kind in ('forest', 'cooccurrence'):
+            if kind == 'forest' and n > args.forest_max:
+                print(f"{kind:>13} {n:>8}  건너뜀 (--forest-max {args.forest_max} 초과)")
+                continue
+            r = run(kind, n, args, rng, templates)
+            print(f"{kind:>13} {n:>8} {r['fit_s']:>8.2f}s {r['size_mb']:>8.2f}MB {r['batch_ms']:>9.3f}ms "
+                  f"{r['single_ms']:>9.3f}ms {r['auc']:>6.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
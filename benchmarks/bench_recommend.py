@@ -0,0 +1,290 @@
+"""추천 경로 벤치마크 (로컬 SQLite 대역)
+
+실제 PostgreSQL과 학습된 모델 없이, 임시 디렉터리에 만든 SQLite DB에
+합성 카탈로그(components + 스펙 테이블)와 confirmed_quotes를 채운 뒤
+    train     train_model.train_model() 시간, 쿼리 수, 최대 RSS 증가량
+    recommend /recommend 지연 시간 백분위수, 요청당 쿼리 수, 메모리(RSS 증가, 할당 최대)
+    component /recommend_component 지연 시간 백분위수, 요청당 쿼리 수, 메모리
+    tiers     (--tiers) 예산 구간 표 생성 시간 (이때 /recommend는 표에서 답한다)
+를 잰다. --shared를 주면 카탈로그를 catalog_store에 게시하고 서비스가 그것을
+mmap으로 여는 경로(gunicorn 배포와 같음)를 잰다. 배포 전 회귀 비교용이며,
+같은 --seed면 같은 데이터가 만들어진다.
+
+    python benchmarks/bench_recommend.py --components 100000 --quotes 5000 --requests 200 --shared
+
+    python benchmarks/bench_recommend.py --components 10000 --quotes 5000 --requests 500
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COMPONENT_TYPES = ["CPU", "GPU", "RAM", "Storage", "PSU", "Case", "Motherboard"]
+
+# 엔드포인트마다 tracemalloc으로 할당량을 잴 때 실행하는 요청 수
+MEMORY_REQUESTS = 50
+
+# 타입별 (최저가, 최고가) (원)
+PRICE_RANGES = {
+    "CPU": (60000, 900000),
+    "GPU": (150000, 2500000),
+    "RAM": (20000, 400000),
+    "Storage": (30000, 500000),
+    "PSU": (40000, 350000),
+    "Case": (30000, 300000),
+    "Motherboard": (70000, 900000),
+}
+SOCKETS = ["AMD(소켓AM4)", "AMD(소켓AM5)", "인텔(소켓1700)", "인텔(소켓1851)"]
+MEMORY_TYPES = ["DDR4", "DDR5"]
+BOARD_FORM_FACTORS = ["ATX", "M-ATX", "Mini-ITX"]
+CASE_FORM_FACTORS = ["표준-ATX, Micro-ATX, Mini-ITX", "Micro-ATX, Mini-ITX", "Mini-ITX"]
+
+SCHEMA = [
+    "CREATE TABLE components (componentid INTEGER PRIMARY KEY, name TEXT, manufacturer TEXT, price NUMERIC, type TEXT)",
+    "CREATE TABLE cpus (componentid INTEGER, corecount INTEGER, threadcount INTEGER, baseclock NUMERIC,"
+    " boostclock NUMERIC, tdp INTEGER, socket TEXT)",
+    "CREATE TABLE gpus (componentid INTEGER, memory INTEGER, coreclock INTEGER, boostclock INTEGER,"
+    " length INTEGER, powerdraw INTEGER, outputs TEXT)",
+    "CREATE TABLE rams (componentid INTEGER, memorysize INTEGER, memoryspeed INTEGER, type TEXT)",
+    "CREATE TABLE storage (componentid INTEGER, capacity INTEGER, type TEXT, interface TEXT)",
+    "CREATE TABLE psus (componentid INTEGER, wattage INTEGER, efficiencyrating TEXT, modular BOOLEAN)",
+    "CREATE TABLE cases (componentid INTEGER, type TEXT, dimensions TEXT, maxgpulength INTEGER,"
+    " supportedformfactors TEXT)",
+    "CREATE TABLE motherboards (componentid INTEGER, socket TEXT, formfactor TEXT, memoryslots INTEGER,"
+    " maxmemory INTEGER, memorytype TEXT)",
+    "CREATE TABLE confirmed_quotes (quoteid INTEGER PRIMARY KEY AUTOINCREMENT, components TEXT)",
+]
+
+
+def spec_row(type_, componentid, rng):
+    """타입별 스펙 테이블 (테이블, 행). 호환 검사에 쓰는 컬럼만 의미 있는 값을 넣는다"""
+    if type_ == "CPU":
+        return "cpus", (componentid, 8, 16, 3.5, 5.0, 65, rng.choice(SOCKETS))
+    if type_ == "Motherboard":
+        return "motherboards", (componentid, rng.choice(SOCKETS), rng.choice(BOARD_FORM_FACTORS), 4, 128,
+                                rng.choice(MEMORY_TYPES))
+    if type_ == "RAM":
+        return "rams", (componentid, 16, 5600, rng.choice(MEMORY_TYPES))
+    if type_ == "Case":
+        return "cases", (componentid, "미들타워", "Unknown", rng.randrange(250, 420, 10), rng.choice(CASE_FORM_FACTORS))
+    if type_ == "GPU":
+        return "gpus", (componentid, 8, 2000, 2500, rng.randrange(200, 360, 10), rng.randrange(75, 450, 25), "HDMI")
+    if type_ == "PSU":
+        return "psus", (componentid, rng.randrange(400, 1300, 50), "80PLUS", True)
+    return "storage", (componentid, 1000, "SSD", "NVMe")
+
+
+def populate(engine, n_components, n_quotes, seed):
+    """합성 카탈로그와 확정 견적을 채움"""
+    from sqlalchemy.sql import text
+
+    rng = random.Random(seed)
+    components = []
+    specs = {}
+    ids = {type_: [] for type_ in COMPONENT_TYPES}
+    for componentid in range(1, n_components + 1):
+        type_ = COMPONENT_TYPES[componentid % len(COMPONENT_TYPES)]
+        low, high = PRICE_RANGES[type_]
+        price = round(rng.uniform(low, high), -2)
+        components.append({"componentid": componentid, "name": f"{type_} {componentid}", "manufacturer": "Bench",
+                           "price": price, "type": type_})
+        table, row = spec_row(type_, componentid, rng)
+        specs.setdefault(table, []).append(row)
+        ids[type_].append(componentid)
+
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO components VALUES (:componentid, :name, :manufacturer, :price, :type)"),
+                     components)
+        raw = conn.connection.driver_connection
+        for table, rows in specs.items():
+            raw.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(rows[0]))})", rows)
+        # 견적은 타입마다 인기 부품(앞쪽 10%)에 몰리도록 만든다
+        popular = {type_: items[:max(1, len(items) // 10)] for type_, items in ids.items()}
+        quotes = [(json.dumps({type_: rng.choice(popular[type_]) for type_ in COMPONENT_TYPES}),)
+                  for _ in range(n_quotes)]
+        raw.executemany("INSERT INTO confirmed_quotes (components) VALUES (?)", quotes)
+
+
+class QueryCounter:
+    """엔진에서 실행된 쿼리 수와 시간을 센다"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self.seconds = 0.0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["bench_started"] = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.seconds += time.perf_counter() - conn.info.pop("bench_started", time.perf_counter())
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "max": samples[-1]}
+
+
+def measure(name, call, requests, counter, memory_requests=MEMORY_REQUESTS):
+    """call(i)를 requests번 실행해 지연 시간(ms), 요청당 쿼리 수, 메모리를 반환
+
+    메모리는 두 가지를 잰다. 하나는 지연 시간을 재는 동안의 최대 RSS 증가이다.
+    다른 하나는 그 뒤 memory_requests번을 tracemalloc으로 다시 실행해 얻은 파이썬
+    할당 최대치이다. tracemalloc은 실행을 느리게 하므로 지연 시간 측정과 따로 돈다.
+    """
+    latencies = []
+    queries = 0
+    failures = 0
+    rss_before = max_rss_mb()
+    for i in range(requests):
+        before = counter.count
+        start = time.perf_counter()
+        status = call(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries += counter.count - before
+        failures += status >= 400
+    result = {"name": name, "requests": requests, "failures": failures, "queries_per_request": queries / requests}
+    result.update({key: round(value, 3) for key, value in percentiles(latencies).items()})
+    result["peak_rss_growth_mb"] = round(max_rss_mb() - rss_before, 1)
+
+    tracemalloc.start()
+    try:
+        for i in range(min(requests, memory_requests)):
+            call(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result["peak_alloc_mb"] = round(peak / 2 ** 20, 2)
+    return result
+
+
+def max_rss_mb():
+    # 리눅스의 ru_maxrss는 KB 단위
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 경로 벤치마크 (합성 데이터, SQLite)")
+    parser.add_argument('--components', type=int, default=10000, help="합성 부품 수")
+    parser.add_argument('--quotes', type=int, default=5000, help="합성 확정 견적 수")
+    parser.add_argument('--requests', type=int, default=500, help="엔드포인트별 요청 수")
+    parser.add_argument('--min-budget', type=int, default=500000)
+    parser.add_argument('--max-budget', type=int, default=5000000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--kind', default='cooccurrence', help="학습할 모델 종류 (train_model.MODEL_KINDS)")
+    parser.add_argument('--tiers', action='store_true', help="예산 구간 표를 미리 만들고 표로 답하는 경로를 잼")
+    parser.add_argument('--shared', action='store_true', help="게시된 공유 카탈로그(mmap)로 답하는 경로를 잼")
+    parser.add_argument('--workdir', help="DB와 모델을 둘 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_recommend_')
+    os.makedirs(workdir, exist_ok=True)
+    # db.py는 import 시점에 엔진을 만들고, 모델/학습 상태는 현재 디렉터리 기준이다
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.chdir(workdir)
+
+    import logging
+    # 견적마다 클래스가 하나라 sklearn이 매 트리마다 경고를 낸다
+    warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
+    import db
+    import train_model
+
+    rng = random.Random(args.seed)
+    results = {"components": args.components, "quotes": args.quotes, "workdir": workdir}
+
+    start = time.perf_counter()
+    populate(db.engine, args.components, args.quotes, args.seed)
+    results["populate_seconds"] = round(time.perf_counter() - start, 3)
+
+    counter = QueryCounter(db.engine)
+    # sklearn의 트리 배열은 tracemalloc에 잡히지 않으므로 최대 RSS 증가량으로 본다
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    before = counter.count
+    train_model.train_model(args.kind)
+    results["train"] = {
+        "seconds": round(time.perf_counter() - start, 3),
+        "queries": counter.count - before,
+        "peak_rss_growth_mb": round(max_rss_mb() - rss_before, 1),
+    }
+
+    results["catalog"] = "shared" if args.shared else "memory"
+    if args.shared:
+        from catalog import ComponentCatalog
+        from catalog_store import publish_catalog
+
+        start = time.perf_counter()
+        loader = ComponentCatalog(db.engine)
+        loader.refresh()
+        root = os.path.join(workdir, 'catalog_store')
+        publish_catalog(loader.snapshot(), root)
+        del loader
+        results["publish_seconds"] = round(time.perf_counter() - start, 3)
+        os.environ['CATALOG_SHARED_DIR'] = root
+
+    import app as service
+    logging.getLogger().setLevel(logging.WARNING)
+    # 서비스는 요청용 엔진을 따로 만든다 (db.engine은 배치 작업용)
+    counter = QueryCounter(service.engine)
+    service.catalog.stop_auto_refresh()
+    # 구간 표는 서비스 밖에서 만들므로, 쓸 때는 측정 전에 직접 만든다
+    if args.tiers:
+        start = time.perf_counter()
+        table = service.build_tiers()
+        table.save(service.tier_store.path)
+        service.tier_store.load()
+        results["tiers_seconds"] = round(time.perf_counter() - start, 3)
+    client = service.app.test_client()
+
+    budgets = [rng.randrange(args.min_budget, args.max_budget, 1000) for _ in range(args.requests)]
+    types = [rng.choice(COMPONENT_TYPES) for _ in range(args.requests)]
+    # 카탈로그와 모델은 첫 요청 때 읽으므로 측정 전에 한 번 데운다
+    client.post('/recommend', json={"budget": args.max_budget})
+
+    results["recommend"] = measure(
+        "/recommend", lambda i: client.post('/recommend', json={"budget": budgets[i]}).status_code,
+        args.requests, counter)
+    results["recommend_component"] = measure(
+        "/recommend_component",
+        lambda i: client.get('/recommend_component', query_string={"type": types[i], "budget": budgets[i] // 4}).status_code,
+        args.requests, counter)
+    results["catalog_components"] = len(service.catalog.snapshot().by_id)
+    results["max_rss_mb"] = round(max_rss_mb(), 1)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+    print(f"부품 {args.components}개, 견적 {args.quotes}개, 모델 {args.kind}, 카탈로그 {results['catalog']} "
+          f"(데이터 생성 {results['populate_seconds']}s, {workdir})")
+    train = results["train"]
+    print(f"{'train':>20}: {train['seconds']}s, 쿼리 {train['queries']}개, 최대 RSS 증가 {train['peak_rss_growth_mb']}MB")
+    for key in ("recommend", "recommend_component"):
+        r = results[key]
+        print(f"{r['name']:>20}: p50 {r['p50']}ms  p95 {r['p95']}ms  p99 {r['p99']}ms  max {r['max']}ms  "
+              f"RSS 증가 {r['peak_rss_growth_mb']}MB  할당 최대 {r['peak_alloc_mb']}MB  "
+              f"요청당 쿼리 {r['queries_per_request']:.2f}  실패 {r['failures']}/{r['requests']}")
+    if args.tiers:
+        print(f"{'tier table':>20}: {results['tiers_seconds']}s")
+    print(f"{'max RSS':>20}: {results['max_rss_mb']}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """LRU + TTL 메모리 캐시
+
+    maxsize개를 넘으면 가장 오래 쓰지 않은 항목을 버리고, 넣은 지 ttl초가
+    지난 항목은 없는 것으로 본다. invalidate(조건)으로 키 조건에 맞는 항목만
+    지울 수 있어 카탈로그 갱신 때 바뀐 타입의 항목만 버릴 수 있다.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        """key의 값 (없거나 만료되었으면 None)"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """key의 값을 반환하고, 없으면 factory()로 만들어 넣은 뒤 반환"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, predicate=None):
+        """predicate(key)가 참인 항목을 지움 (None이면 전부)"""
+        with self._lock:
+            if predicate is None:
+                self._items.clear()
+                return
+            for key in [key for key in self._items if predicate(key)]:
+                del self._items[key]
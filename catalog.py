@@ -0,0 +1,345 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from db import COMPONENTS_QUERY, COMPONENTS_OF_TYPE_QUERY, CATALOG_VERSIONS_QUERY, CATALOG_VERSIONS_SCHEMA, SPEC_QUERIES
+from compatibility import CompatibilityIndex
+
+# 부품 한 개의 정보 (componentid, 이름, 가격, 타입)
+Component = namedtuple('Component', ['id', 'name', 'price', 'type'])
+
+# 부품 타입. 모델 입력 슬롯과 구간 표 ID 열의 순서이므로 모든 모듈이 이 목록을 쓴다
+# (순서를 바꾸면 저장된 모델과 표를 다시 만들어야 한다)
+COMPONENT_TYPES = ["CPU", "GPU", "RAM", "Storage", "PSU", "Case", "Motherboard"]
+
+# 카탈로그를 읽을 때 동시에 실행하는 최대 쿼리 수 (풀에서 이만큼 연결을 빌린다)
+LOAD_WORKERS = 4
+
+# 부품 타입 → 호환 그룹을 만드는 스펙 테이블
+SPEC_TABLES = {
+    "CPU": "cpus",
+    "Motherboard": "motherboards",
+    "RAM": "rams",
+    "Case": "cases",
+    "GPU": "gpus",
+    "PSU": "psus",
+}
+
+
+class Snapshot(namedtuple('Snapshot', ['by_id', 'by_type', 'compatibility', 'specs', 'versions'])):
+    """카탈로그 스냅샷
+
+    by_id: ID별 부품, by_type: 타입별 가격 인덱스, compatibility: 호환 그룹,
+    specs: 호환 그룹을 만든 스펙 테이블 행, versions: 읽을 때의 catalog_versions
+    """
+    __slots__ = ()
+
+    def of_type(self, type):
+        """특정 타입의 가격순 인덱스를 반환"""
+        return self.by_type.get(type) or TypeIndex([])
+
+    def digest(self):
+        """타입별 부품 ID와 가격으로 만든 내용 해시 (같은 내용이면 프로세스가 달라도 같음)"""
+        h = hashlib.sha1()
+        for type_ in sorted(self.by_type):
+            index = self.by_type[type_]
+            h.update(type_.encode('utf-8'))
+            h.update(np.ascontiguousarray(index.ids, dtype=np.int64).tobytes())
+            h.update(np.ascontiguousarray(index.prices, dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+
+class ComponentRange:
+    """가격 오름차순 부품 목록의 읽기 전용 뷰
+
+    ids와 prices는 배열이고 Component는 인덱스로 꺼낼 때 component(저장 위치)로
+    만든다. 솔버와 후보 거르기는 배열만 보고, 실제로 탐색하거나 응답에 담는
+    부품만 Component가 된다 (공유 카탈로그에서는 이때 이름을 디코딩한다).
+    저장 위치는 positions 배열, 또는 positions가 없으면 start부터 연속이다.
+    """
+
+    def __init__(self, ids, prices, component, start=0, positions=None):
+        self.ids = ids
+        self.prices = prices
+        self._component = component
+        self._start = start
+        self._positions = positions
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        item = self._cache.get(index)
+        if item is None:
+            position = self._start + index if self._positions is None else int(self._positions[index])
+            item = self._cache[index] = self._component(position)
+        return item
+
+    def take(self, indices):
+        """indices(오름차순 인덱스 배열)의 부품만 남긴 뷰"""
+        indices = np.asarray(indices, dtype=np.int64)
+        positions = self._start + indices if self._positions is None else self._positions[indices]
+        return ComponentRange(self.ids[indices], self.prices[indices], self._component, positions=positions)
+
+
+class TypeIndex:
+    """한 타입의 부품을 가격 오름차순으로 정렬해 둔 인덱스
+
+    prices는 components와 같은 순서의 가격 배열이라 예산 이하인 부품은
+    항상 앞쪽 구간(prefix)에 모여 있고, 그 경계는 이분 탐색으로 찾는다.
+    """
+
+    def __init__(self, components):
+        self.components = sorted(components, key=lambda c: (c.price, c.id))
+        self.prices = np.array([c.price for c in self.components], dtype=np.float64)
+        self.ids = np.array([c.id for c in self.components], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.components)
+
+    def affordable_count(self, budget):
+        """가격이 budget 이하인 부품의 개수 (= 예산 내 구간의 길이)"""
+        return int(np.searchsorted(self.prices, budget, side='right'))
+
+    def affordable(self, budget):
+        """가격이 budget 이하인 부품의 뷰 (가격 오름차순, ComponentRange)"""
+        n = self.affordable_count(budget)
+        return ComponentRange(self.ids[:n], self.prices[:n], self.components.__getitem__)
+
+
+class ComponentCatalog:
+    """components 테이블의 읽기 전용 메모리 스냅샷
+
+    프로세스 전체에서 하나만 두고 공유한다. 스냅샷은 통째로 교체되므로
+    읽는 쪽은 락 없이 현재 스냅샷을 참조하면 된다.
+
+    자동 갱신은 catalog_versions(스크래퍼 loader가 바뀐 타입의 버전을 올림)를
+    보고 버전이 바뀐 타입만 다시 읽는다. 스냅샷이 바뀌면 add_listener로
+    등록한 함수를 바뀐 타입 집합과 함께 호출한다.
+
+    shared_root를 주면 DB 대신 로더 프로세스가 catalog_store에 게시한 배열
+    스냅샷을 mmap으로 열어 여러 작업 프로세스가 같은 메모리를 쓴다 (게시된
+    스냅샷이 아직 없으면 DB에서 직접 읽는다).
+    """
+
+    def __init__(self, engine, refresh_interval=None, shared_root=None):
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self.shared_root = shared_root
+        self._shared_version = None
+        self._shared_published = None
+        self._snapshot = None
+        self._load_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._timer = None
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """스냅샷이 바뀔 때 listener(바뀐 타입 집합)를 호출하도록 등록"""
+        self._listeners.append(listener)
+
+    def _read_versions(self):
+        """catalog_versions를 {타입: 버전}으로 읽음 (테이블이 없으면 None)"""
+        try:
+            with self.engine.connect() as conn:
+                return dict(conn.execute(CATALOG_VERSIONS_QUERY).fetchall())
+        except DBAPIError as e:
+            logging.debug(f"Catalog versions unavailable: {e}")
+            return None
+
+    def _create_versions_table(self):
+        """catalog_versions가 없으면 빈 테이블로 만들어 {}를 반환 (만들 수 없으면 None)
+
+        테이블이 없으면 스크래퍼 loader가 처음 돌기 전까지 변경 여부를 알 수 없으므로
+        첫 로드 때 만들어 두고, 이후에는 버전이 바뀐 타입만 다시 읽는다.
+        """
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(CATALOG_VERSIONS_SCHEMA))
+        except DBAPIError as e:
+            logging.warning(f"Could not create catalog_versions: {e}")
+            return None
+        logging.info("Created empty catalog_versions table")
+        return {}
+
+    def _fetch_all(self, queries):
+        """{이름: (쿼리, 파라미터)}를 풀의 연결 여러 개로 동시에 실행해 {이름: 행 목록}을 반환
+
+        서로 독립인 테이블 조회를 나눠 실행하므로 갱신 시간이 쿼리 시간의 합이
+        아니라 가장 느린 쿼리에 가까워진다.
+        """
+        def fetch(item):
+            query, params = item
+            with self.engine.connect() as conn:
+                return conn.execute(query, params or {}).fetchall()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(len(queries), LOAD_WORKERS))) as executor:
+            return dict(zip(queries, executor.map(fetch, queries.values())))
+
+    def _refresh_shared(self, force=False):
+        """게시된 공유 스냅샷이 바뀌었으면 교체하고 바뀐 타입 집합을 반환 (게시된 것이 없으면 None)"""
+        from catalog_store import load_catalog, published_at
+        from versioned_store import current_version
+
+        with self._refresh_lock:
+            version = current_version(self.shared_root)
+            if version is None:
+                return None
+            old = self._snapshot
+            if version == self._shared_version and not force:
+                return set()
+            _, snapshot = load_catalog(self.shared_root, version)
+            if old is not None and old.versions and snapshot.versions:
+                changed = {type_ for type_ in set(snapshot.versions) | set(old.versions)
+                           if snapshot.versions.get(type_) != old.versions.get(type_)}
+            else:
+                changed = set(snapshot.by_type) | (set(old.by_type) if old else set())
+            self._snapshot = snapshot
+            self._shared_version = version
+            self._shared_published = published_at(self.shared_root, version)
+            logging.info(f"Shared catalog {version} attached: {len(snapshot.by_id)} components")
+        self._notify(changed)
+        return changed
+
+    def shared_age(self):
+        """지금 쓰는 공유 스냅샷이 게시된 뒤 지난 시간 (초, 공유 스냅샷이 아니면 None)"""
+        if self._shared_published is None:
+            return None
+        return time.time() - self._shared_published
+
+    def refresh(self):
+        """DB에서 components 테이블 전체를 다시 읽어 스냅샷을 교체"""
+        if self.shared_root:
+            changed = self._refresh_shared(force=True)
+            if changed is not None:
+                return changed
+            logging.warning(f"No shared catalog in {self.shared_root}, loading from the database")
+        with self._refresh_lock:
+            versions = self._read_versions()
+            if versions is None:
+                versions = self._create_versions_table()
+            queries = {table: (query, None) for table, query in SPEC_QUERIES.items()}
+            queries[None] = (COMPONENTS_QUERY, None)
+            specs = self._fetch_all(queries)
+            rows = specs.pop(None)
+
+            by_id = {}
+            by_type = {}
+            for componentid, name, price, type_ in rows:
+                component = Component(componentid, name, float(price), type_)
+                by_id[componentid] = component
+                by_type.setdefault(type_, []).append(component)
+            by_type = {type_: TypeIndex(items) for type_, items in by_type.items()}
+
+            old = self._snapshot
+            self._snapshot = Snapshot(by_id, by_type, CompatibilityIndex(**specs), specs, versions or {})
+            logging.info(f"Catalog refreshed: {len(by_id)} components")
+        changed = set(by_type) | (set(old.by_type) if old else set())
+        self._notify(changed)
+        return changed
+
+    def refresh_changed(self):
+        """catalog_versions가 바뀐 타입만 다시 읽어 스냅샷을 교체하고 바뀐 타입 집합을 반환
+
+        첫 로드이면 전체를 읽는다. 버전을 읽을 수 없으면(테이블을 만들 권한이
+        없는 등) 마지막으로 읽은 스냅샷을 그대로 두고 빈 집합을 반환한다.
+        """
+        if self.shared_root:
+            changed = self._refresh_shared()
+            if changed is not None:
+                return changed
+        if self._snapshot is None:
+            return self.refresh()
+        versions = self._read_versions()
+        if versions is None:
+            # 버전을 읽을 수 없으면 바뀐 것을 알 수 없으므로 마지막 로드 그대로 둔다
+            return set()
+
+        with self._refresh_lock:
+            old = self._snapshot
+            changed = {type_ for type_ in set(versions) | set(old.versions)
+                       if versions.get(type_) != old.versions.get(type_)}
+            if not changed:
+                return changed
+            queries = {type_: (COMPONENTS_OF_TYPE_QUERY, {"type": type_}) for type_ in changed}
+            queries.update({
+                SPEC_TABLES[type_]: (SPEC_QUERIES[SPEC_TABLES[type_]], None)
+                for type_ in changed if type_ in SPEC_TABLES
+            })
+            fetched = self._fetch_all(queries)
+            fresh = {type_: fetched[type_] for type_ in changed}
+            specs = dict(old.specs)
+            specs.update((SPEC_TABLES[type_], fetched[SPEC_TABLES[type_]]) for type_ in changed if type_ in SPEC_TABLES)
+
+            by_id = {componentid: c for componentid, c in old.by_id.items() if c.type not in changed}
+            by_type = {type_: index for type_, index in old.by_type.items() if type_ not in changed}
+            for type_, rows in fresh.items():
+                components = [Component(componentid, name, float(price), type_) for componentid, name, price, _ in rows]
+                by_id.update((c.id, c) for c in components)
+                if components:
+                    by_type[type_] = TypeIndex(components)
+            compatibility = old.compatibility
+            if any(type_ in SPEC_TABLES for type_ in changed):
+                compatibility = CompatibilityIndex(**specs)
+
+            self._snapshot = Snapshot(by_id, by_type, compatibility, specs, versions)
+            logging.info(f"Catalog refreshed types {sorted(changed)}: {len(by_id)} components")
+        self._notify(changed)
+        return changed
+
+    def _notify(self, changed):
+        for listener in self._listeners:
+            try:
+                listener(changed)
+            except Exception as e:
+                logging.error(f"Catalog listener failed: {e}")
+
+    def snapshot(self):
+        """현재 스냅샷을 반환. 처음 호출 시 한 번 로드"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self.refresh()
+                snapshot = self._snapshot
+        return snapshot
+
+    def get(self, componentid):
+        """componentid에 해당하는 부품을 반환 (없으면 None)"""
+        return self.snapshot().by_id.get(componentid)
+
+    def of_type(self, type):
+        """특정 타입의 가격순 인덱스를 반환"""
+        return self.snapshot().of_type(type)
+
+    def start_auto_refresh(self):
+        """refresh_interval(초)마다 백그라운드에서 바뀐 타입을 갱신"""
+        if not self.refresh_interval:
+            return
+        self._timer = threading.Timer(self.refresh_interval, self._auto_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _auto_refresh(self):
+        try:
+            self.refresh_changed()
+        except Exception as e:
+            logging.error(f"Catalog refresh failed: {e}")
+        self.start_auto_refresh()
+
+    def stop_auto_refresh(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,199 @@
+"""여러 작업 프로세스가 mmap으로 함께 쓰는 카탈로그 스냅샷 저장소
+
+로더 프로세스 하나가 DB에서 카탈로그를 읽어 배열 파일로 게시하면, 작업
+프로세스들은 그 파일을 mmap으로 열어 같은 물리 메모리를 공유한다. 부품은
+타입별로 가격 오름차순으로 이어 붙여 저장하므로 타입 하나는 배열의 연속 구간이고,
+예산 내 후보는 그 구간의 뷰(ComponentRange)이다. Component 객체는 솔버가 실제로
+탐색하거나 응답에 담는 부품만 그때그때 만든다. 작업 프로세스마다
+따로 갖는 것은 호환 그룹(CompatibilityIndex)뿐이다.
+
+모델 저장소와 같이 버전 디렉터리에 모두 쓴 뒤 CURRENT를 원자적으로 바꾼다 (versioned_store).
+로더는 DB 확인에 성공할 때마다 HEARTBEAT 파일의 수정 시각을 갱신하므로,
+작업 프로세스는 그 나이로 로더가 멈췄는지 알 수 있다 (/metrics).
+
+    python catalog_store.py --watch   # DB 변경을 감시하며 계속 게시 (gunicorn.conf.py가 실행)
+"""
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from catalog import Component, ComponentRange, Snapshot
+from compatibility import CompatibilityIndex
+from versioned_store import stage_version, publish_version, current_version
+
+CATALOG_STORE_DIR = 'catalog_store'
+HEARTBEAT_FILE = 'HEARTBEAT'
+WATCH_INTERVAL = 60  # 초
+
+# 배열 파일 이름 (모두 .npy로 저장되어 mmap으로 읽힘)
+CATALOG_ARRAYS = ['ids', 'prices', 'name_offsets', 'names', 'id_order']
+
+
+class SharedTypeIndex:
+    """배열의 한 구간을 TypeIndex처럼 쓰는 가격순 인덱스"""
+
+    def __init__(self, arrays, type, start, stop):
+        self.arrays = arrays
+        self.type = type
+        self.start = start
+        self.stop = stop
+        self.prices = arrays['prices'][start:stop]
+        self.ids = arrays['ids'][start:stop]
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def component(self, position):
+        return _component(self.arrays, self.start + position, self.type)
+
+    def affordable_count(self, budget):
+        """가격이 budget 이하인 부품의 개수 (= 예산 내 구간의 길이)"""
+        return int(np.searchsorted(self.prices, budget, side='right'))
+
+    def affordable(self, budget):
+        """가격이 budget 이하인 부품의 뷰 (가격 오름차순, 배열 구간을 그대로 씀)"""
+        n = self.affordable_count(budget)
+        return ComponentRange(self.ids[:n], self.prices[:n], self.component)
+
+
+class SharedById:
+    """componentid → Component 조회 (정렬된 ID 순서 배열에서 이분 탐색)"""
+
+    def __init__(self, arrays, types):
+        self.arrays = arrays
+        self.types = types
+        self.bounds = [stop for _, _, stop in types]
+
+    def __len__(self):
+        return len(self.arrays['ids'])
+
+    def get(self, componentid, default=None):
+        ids, order = self.arrays['ids'], self.arrays['id_order']
+        position = int(np.searchsorted(ids, componentid, sorter=order))
+        if position == len(order) or ids[order[position]] != componentid:
+            return default
+        index = int(order[position])
+        type_ = self.types[int(np.searchsorted(self.bounds, index, side='right'))][0]
+        return _component(self.arrays, index, type_)
+
+    def __contains__(self, componentid):
+        return self.get(componentid) is not None
+
+
+def _component(arrays, index, type_):
+    offsets = arrays['name_offsets']
+    name = bytes(arrays['names'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+    return Component(int(arrays['ids'][index]), name, float(arrays['prices'][index]), type_)
+
+
+def publish_catalog(snapshot, root=CATALOG_STORE_DIR):
+    """스냅샷을 새 버전으로 저장하고 현재 버전으로 지정"""
+    version, staging = stage_version(root)
+
+    components, types = [], []
+    for type_ in sorted(snapshot.by_type):
+        items = snapshot.of_type(type_).affordable(float('inf'))
+        types.append((type_, len(components), len(components) + len(items)))
+        components.extend(items)
+    names = [c.name.encode('utf-8') for c in components]
+    ids = np.array([c.id for c in components], dtype=np.int64)
+    arrays = {
+        'ids': ids,
+        'prices': np.array([c.price for c in components], dtype=np.float64),
+        'name_offsets': np.concatenate([[0], np.cumsum([len(n) for n in names], dtype=np.int64)]).astype(np.int64),
+        'names': np.frombuffer(b''.join(names), dtype=np.uint8),
+        'id_order': np.argsort(ids, kind='stable'),
+    }
+    for name in CATALOG_ARRAYS:
+        np.save(os.path.join(staging, f'{name}.npy'), arrays[name])
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump({"version": version, "types": types, "versions": snapshot.versions}, f)
+    with open(os.path.join(staging, 'specs.json'), 'w') as f:
+        # numeric 열은 Decimal로 읽히므로 float로 저장한다 (호환 그룹도 float로 비교함)
+        json.dump({table: [list(row) for row in rows] for table, rows in snapshot.specs.items()}, f, default=float)
+
+    publish_version(root, version, staging)
+    return version
+
+
+def load_catalog(root=CATALOG_STORE_DIR, version=None):
+    """게시된 버전을 mmap으로 열어 (버전, Snapshot)을 반환 (게시된 버전이 없으면 (None, None))"""
+    version = version or current_version(root)
+    if version is None:
+        return None, None
+    path = os.path.join(root, version)
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in CATALOG_ARRAYS}
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    with open(os.path.join(path, 'specs.json')) as f:
+        specs = {table: [tuple(row) for row in rows] for table, rows in json.load(f).items()}
+    types = [tuple(item) for item in meta["types"]]
+    by_type = {type_: SharedTypeIndex(arrays, type_, start, stop) for type_, start, stop in types}
+    snapshot = Snapshot(SharedById(arrays, types), by_type, CompatibilityIndex(**specs), specs, meta["versions"])
+    return version, snapshot
+
+
+def published_at(root, version):
+    """게시된 버전의 게시 시각 (epoch 초, 없으면 None)"""
+    try:
+        return os.path.getmtime(os.path.join(root, version))
+    except OSError:
+        return None
+
+
+def heartbeat_age(root=CATALOG_STORE_DIR):
+    """로더가 마지막으로 DB 확인에 성공한 뒤 지난 시간 (초, 기록이 없으면 None)"""
+    try:
+        return time.time() - os.path.getmtime(os.path.join(root, HEARTBEAT_FILE))
+    except OSError:
+        return None
+
+
+def _beat(root):
+    path = os.path.join(root, HEARTBEAT_FILE)
+    with open(path, 'a'):
+        os.utime(path)
+
+
+def watch(root=CATALOG_STORE_DIR, interval=WATCH_INTERVAL):
+    """DB의 catalog_versions를 주기적으로 확인하고, 바뀌면 새 스냅샷을 게시"""
+    from db import engine
+    from catalog import ComponentCatalog
+
+    catalog = ComponentCatalog(engine)
+    catalog.add_listener(lambda changed: logging.info(
+        f"Catalog published: {publish_catalog(catalog.snapshot(), root)} (changed {sorted(changed)})"))
+    catalog.refresh()
+    _beat(root)
+    while True:
+        time.sleep(interval)
+        try:
+            catalog.refresh_changed()
+        except Exception as e:
+            logging.error(f"Catalog refresh failed: {e}")
+            continue
+        _beat(root)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="공유 카탈로그 스냅샷 게시")
+    parser.add_argument('--root', default=CATALOG_STORE_DIR, help="저장소 디렉터리")
+    parser.add_argument('--watch', action='store_true', help="종료하지 않고 변경될 때마다 다시 게시")
+    parser.add_argument('--interval', type=int, default=WATCH_INTERVAL, help="변경 확인 주기 (초)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s : %(message)s')
+
+    if args.watch:
+        watch(args.root, args.interval)
+    else:
+        from db import engine
+        from catalog import ComponentCatalog
+
+        catalog = ComponentCatalog(engine)
+        catalog.refresh()
+        print(f"카탈로그 게시 완료: {publish_catalog(catalog.snapshot(), args.root)}")
@@ -0,0 +1,150 @@
+import re
+from bisect import bisect_left, bisect_right
+
+# 부품 간 의존 순서 (앞 타입의 선택이 뒤 타입의 후보를 제한)
+COMPATIBILITY_ORDER = ["Motherboard", "CPU", "RAM", "Case", "GPU", "PSU", "Storage"]
+
+# 메인보드 스크래퍼의 폼팩터 표기 → 케이스 스크래퍼의 표기
+BOARD_FORM_FACTORS = {
+    "E-ATX": "Extended-ATX",
+    "ATX": "표준-ATX",
+    "M-ATX": "Micro-ATX",
+    "Mini-ITX": "Mini-ITX",
+}
+
+SOCKET_PATTERN = re.compile(r"소켓\s*([^\s)/,]+)")
+
+
+def normalize_socket(value):
+    """'AMD(소켓AM5)', '인텔(소켓1700) ' 같은 표기에서 소켓 이름만 추출"""
+    if not value:
+        return None
+    match = SOCKET_PATTERN.search(value)
+    return match.group(1).upper() if match else value.strip().upper()
+
+
+def normalize_memory_type(value):
+    return value.strip().upper() if value else None
+
+
+def split_form_factors(value):
+    """케이스의 'Micro-ATX, Mini-ITX' 같은 지원 폼팩터 문자열을 목록으로 변환"""
+    if not value or value == "Unknown":
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class KeyGroups:
+    """호환 키(소켓, 메모리 규격 등)별 부품 ID 집합
+
+    키를 알 수 없는 부품은 모든 키와 호환되는 것으로 보고 모든 그룹에 포함한다.
+    """
+
+    def __init__(self, keyed):
+        groups = {}
+        wildcard = set()
+        for componentid, keys in keyed:
+            if not keys:
+                wildcard.add(componentid)
+            for key in keys:
+                groups.setdefault(key, set()).add(componentid)
+        self.wildcard = frozenset(wildcard)
+        self.groups = {key: frozenset(ids | wildcard) for key, ids in groups.items()}
+
+    def members(self, key):
+        if key is None:
+            return None
+        return self.groups.get(key, self.wildcard)
+
+
+class ThresholdGroups:
+    """수치 조건(길이 이하, 출력 이상)을 만족하는 부품 ID 집합을 임계값별로 미리 계산"""
+
+    def __init__(self, valued, thresholds, at_least=False):
+        known = sorted((value, componentid) for componentid, value in valued if value is not None)
+        unknown = frozenset(componentid for componentid, value in valued if value is None)
+        values = [value for value, _ in known]
+        self.at_least = at_least
+        self.groups = {}
+        for threshold in set(thresholds):
+            if at_least:
+                ids = [componentid for _, componentid in known[bisect_left(values, threshold):]]
+            else:
+                ids = [componentid for _, componentid in known[:bisect_right(values, threshold)]]
+            self.groups[threshold] = frozenset(ids) | unknown
+
+    def members(self, threshold):
+        if threshold is None:
+            return None
+        return self.groups.get(threshold)
+
+
+class CompatibilityIndex:
+    """스펙 테이블로부터 미리 계산한 부품 호환 그룹
+
+    allowed(타입, 선택된 부품)는 이미 고른 부품과 호환되는 ID 집합을
+    반환하며, 제약이 없으면 None을 반환한다. 추천 시에는 후보 목록과
+    이 집합의 교집합만 보면 된다.
+    """
+
+    order = COMPATIBILITY_ORDER
+    # 다른 타입의 후보를 제한하는 타입
+    constraining = frozenset(["Motherboard", "Case", "GPU"])
+
+    def __init__(self, cpus, motherboards, rams, cases, gpus, psus):
+        """각 인자는 스펙 테이블의 행 목록
+
+        cpus: (componentid, socket)
+        motherboards: (componentid, socket, formfactor, memorytype)
+        rams: (componentid, type)
+        cases: (componentid, maxgpulength, supportedformfactors)
+        gpus: (componentid, length, powerdraw)
+        psus: (componentid, wattage)
+        """
+        self.board_socket = {}
+        self.board_memory_type = {}
+        self.board_form_factor = {}
+        for componentid, socket, formfactor, memorytype in motherboards:
+            self.board_socket[componentid] = normalize_socket(socket)
+            self.board_memory_type[componentid] = normalize_memory_type(memorytype)
+            self.board_form_factor[componentid] = BOARD_FORM_FACTORS.get(formfactor)
+        self.case_gpu_length = {componentid: _number(length) for componentid, length, _ in cases}
+        self.gpu_power_draw = {componentid: _number(powerdraw) for componentid, _, powerdraw in gpus}
+
+        socket_cpus = [(componentid, [normalize_socket(socket)] if socket else []) for componentid, socket in cpus]
+        self.cpus_by_socket = KeyGroups(socket_cpus)
+        memory_rams = [(componentid, [normalize_memory_type(type_)] if type_ else []) for componentid, type_ in rams]
+        self.rams_by_memory_type = KeyGroups(memory_rams)
+        self.cases_by_form_factor = KeyGroups(
+            (componentid, split_form_factors(formfactors)) for componentid, _, formfactors in cases
+        )
+        self.gpus_by_case_length = ThresholdGroups(
+            [(componentid, _number(length)) for componentid, length, _ in gpus],
+            [length for length in self.case_gpu_length.values() if length is not None],
+        )
+        self.psus_by_power_draw = ThresholdGroups(
+            [(componentid, _number(wattage)) for componentid, wattage in psus],
+            [draw for draw in self.gpu_power_draw.values() if draw is not None],
+            at_least=True,
+        )
+
+    def allowed(self, type_, chosen):
+        """chosen({타입: Component})과 호환되는 type_ 부품 ID 집합 (제약 없으면 None)"""
+        if type_ == "CPU" and "Motherboard" in chosen:
+            return self.cpus_by_socket.members(self.board_socket.get(chosen["Motherboard"].id))
+        if type_ == "RAM" and "Motherboard" in chosen:
+            return self.rams_by_memory_type.members(self.board_memory_type.get(chosen["Motherboard"].id))
+        if type_ == "Case" and "Motherboard" in chosen:
+            return self.cases_by_form_factor.members(self.board_form_factor.get(chosen["Motherboard"].id))
+        if type_ == "GPU" and "Case" in chosen:
+            return self.gpus_by_case_length.members(self.case_gpu_length.get(chosen["Case"].id))
+        if type_ == "PSU" and "GPU" in chosen:
+            return self.psus_by_power_draw.members(self.gpu_power_draw.get(chosen["GPU"].id))
+        return None
+
+
+def _number(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,114 @@
+"""app.py, train_model.py, 스크래퍼가 함께 쓰는 데이터베이스 접근 모듈
+
+연결 설정은 환경 변수에서 읽는다.
+    DATABASE_URL            SQLAlchemy 접속 URL
+    DB_POOL_SIZE            풀에 유지하는 연결 수 (기본 5)
+    DB_MAX_OVERFLOW         풀 크기를 넘어 임시로 여는 연결 수 (기본 10)
+    DB_POOL_TIMEOUT         풀에서 연결을 기다리는 최대 시간, 초 (기본 30)
+    DB_POOL_RECYCLE         연결을 다시 맺는 주기, 초 (기본 1800)
+    DB_POOL_PRE_PING        연결을 꺼낼 때 살아 있는지 확인 (기본 1)
+    DB_STATEMENT_TIMEOUT_MS 웹 요청 연결의 PostgreSQL statement_timeout, 밀리초 (기본 5000, 0이면 없음)
+    DB_PREPARE_THRESHOLD    같은 문장을 이 횟수만큼 실행하면 서버 측 prepared statement로
+                            바꿈 (기본 5, 0이면 끔. 트랜잭션 모드 pgbouncer 뒤에서는 0)
+
+PostgreSQL은 psycopg(3) 드라이버로 접속한다 (pip install "psycopg[binary]").
+postgresql:// URL도 postgresql+psycopg://로 바꿔 쓴다. psycopg2는 문장을 서버에서
+준비하지 않기 때문이다.
+
+모듈의 engine은 로더, 학습, 카탈로그 게시 같은 배치 작업이 쓰므로 시간 제한이
+없다. 웹 서비스(app.py)는 create_engine(statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS)로
+따로 만든 엔진을 써서, 요청을 처리하는 연결에만 시간 제한이 걸린다.
+"""
+import os
+import sqlalchemy
+from sqlalchemy.sql import text, bindparam
+
+# 데이터베이스 연결 설정
+DATABASE_URL = os.environ.get('DATABASE_URL', "postgresql://<user>:<password>@<host>/<database>")
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 5000))
+DB_PREPARE_THRESHOLD = int(os.environ.get('DB_PREPARE_THRESHOLD', 5))
+
+# 자주 실행되는 쿼리는 한 번만 만들어 재사용한다. 같은 text() 객체는
+# SQLAlchemy의 컴파일 캐시를 타고, psycopg 드라이버는 같은 연결에서
+# DB_PREPARE_THRESHOLD번 실행된 문장을 서버 측 prepared statement로 바꾼다.
+COMPONENTS_QUERY = text("SELECT componentid, name, price, type FROM components")
+COMPONENTS_OF_TYPE_QUERY = text("SELECT componentid, name, price, type FROM components WHERE type = :type")
+# 타입별 데이터 버전 (스크래퍼의 loader가 바뀐 타입의 버전을 올린다)
+CATALOG_VERSIONS_QUERY = text("SELECT type, version FROM catalog_versions")
+# 카탈로그가 처음 읽을 때도 만들어 두므로 SQLite(벤치마크)에서도 통하는 문장으로 쓴다
+CATALOG_VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    type text PRIMARY KEY,
+    version bigint NOT NULL,
+    updated_at timestamptz NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+SPEC_QUERIES = {
+    "cpus": text("SELECT componentid, socket FROM cpus"),
+    "motherboards": text("SELECT componentid, socket, formfactor, memorytype FROM motherboards"),
+    "rams": text("SELECT componentid, type FROM rams"),
+    "cases": text("SELECT componentid, maxgpulength, supportedformfactors FROM cases"),
+    "gpus": text("SELECT componentid, length, powerdraw FROM gpus"),
+    "psus": text("SELECT componentid, wattage FROM psus"),
+}
+INSERT_QUOTE_QUERY = text("INSERT INTO confirmed_quotes (components) VALUES (:components) RETURNING quoteid")
+QUOTES_AFTER_QUERY = text("SELECT quoteid, components FROM confirmed_quotes WHERE quoteid > :after ORDER BY quoteid")
+QUOTES_BY_ID_QUERY = text(
+    "SELECT quoteid, components FROM confirmed_quotes WHERE quoteid IN :ids ORDER BY quoteid"
+).bindparams(bindparam("ids", expanding=True))
+# write-behind 저장용: quoteid를 시퀀스에서 미리 받고, 모인 견적을 한 번에 저장
+QUOTE_ID_BLOCK_QUERY = text(
+    "SELECT nextval(pg_get_serial_sequence('confirmed_quotes', 'quoteid')) FROM generate_series(1, :count)"
+)
+INSERT_QUOTES_QUERY = text("INSERT INTO confirmed_quotes (quoteid, components) VALUES (:quoteid, :components)")
+
+
+def create_engine(url=None, statement_timeout_ms=None):
+    """환경 변수 설정대로 커넥션 풀을 갖춘 엔진을 생성
+
+    statement_timeout_ms를 주면 PostgreSQL 연결마다 statement_timeout을 건다.
+    """
+    url = postgresql_url(url or DATABASE_URL)
+    kwargs = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if not url.startswith('sqlite'):
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    if url.startswith('postgresql+psycopg://'):
+        connect_args = {"prepare_threshold": DB_PREPARE_THRESHOLD or None}
+        if statement_timeout_ms:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+        kwargs["connect_args"] = connect_args
+    elif url.startswith('postgresql') and statement_timeout_ms:
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return sqlalchemy.create_engine(url, **kwargs)
+
+
+def postgresql_url(url):
+    """드라이버를 지정하지 않은 PostgreSQL URL을 psycopg(3) 드라이버 URL로 바꿈"""
+    for prefix in ('postgresql://', 'postgres://'):
+        if url.startswith(prefix):
+            return 'postgresql+psycopg://' + url[len(prefix):]
+    return url
+
+
+# 배치 작업용 엔진 (시간 제한 없음)
+engine = create_engine()
+
+
+def get_db_connection():
+    """풀에서 SQLAlchemy 연결을 꺼내 반환 (close 시 풀로 돌아감)"""
+    return engine.connect()
+
+
+def get_raw_connection():
+    """풀에서 DB-API(psycopg) 연결을 꺼내 반환 (스크래퍼의 cursor 기반 코드용)"""
+    return engine.raw_connection()
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+
+
+def _component_id(label):
+    """LabelEncoder 라벨('123', '123.0')을 부품 ID로 변환 (부품 ID가 아니면 None)"""
+    try:
+        return int(label)
+    except (TypeError, ValueError):
+        pass
+    try:
+        value = float(label)
+    except (TypeError, ValueError):
+        return None
+    return int(value) if value.is_integer() else None
+
+
+class CompiledEncoder:
+    """학습된 LabelEncoder를 조회표로 바꾼 인코더
+
+    sklearn의 transform/inverse_transform은 호출마다 입력 검증과 classes_
+    탐색을 거치므로, 부품 ID → 코드와 코드 → 부품 ID를 모두 배열로 미리
+    만들어 두고 O(1)로 조회한다. 부품 ID는 serial 값이라 code_of는 부품 ID를
+    인덱스로 쓰는 조밀한 배열이며, 두 배열 모두 .npy로 저장해 여러 작업
+    프로세스가 mmap으로 함께 쓸 수 있다.
+    """
+
+    # 학습 데이터에 없는 부품 ID의 코드
+    UNSEEN = -1
+
+    def __init__(self, classes=None, ids=None, code_of=None):
+        if ids is None:
+            ids = [_component_id(label) for label in classes]
+            ids = np.array([self.UNSEEN if i is None else i for i in ids], dtype=np.int64)
+        self.ids = ids
+        if code_of is None:
+            known = np.nonzero(ids >= 0)[0]
+            code_of = np.full(int(ids[known].max()) + 1 if len(known) else 0, self.UNSEEN, dtype=np.int32)
+            code_of[ids[known]] = known
+        self.code_of = code_of
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, componentid):
+        return self.encode(componentid) != self.UNSEEN
+
+    def encode(self, componentid):
+        """부품 ID의 코드 (학습 데이터에 없으면 UNSEEN)"""
+        if 0 <= componentid < len(self.code_of):
+            return int(self.code_of[componentid])
+        return self.UNSEEN
+
+    def known(self, componentids):
+        """componentids 배열 중 학습 데이터에 있는 부품의 불리언 마스크"""
+        componentids = np.asarray(componentids)
+        inside = (componentids >= 0) & (componentids < len(self.code_of))
+        mask = np.zeros(len(componentids), dtype=bool)
+        mask[inside] = self.code_of[componentids[inside]] != self.UNSEEN
+        return mask
+
+    def save(self, path, name):
+        np.save(os.path.join(path, f'encoder-{name}-ids.npy'), self.ids)
+        np.save(os.path.join(path, f'encoder-{name}-codes.npy'), self.code_of)
+
+    @classmethod
+    def load(cls, path, name, mmap_mode='r'):
+        """save로 저장한 배열을 읽음 (없으면 None)"""
+        ids_path = os.path.join(path, f'encoder-{name}-ids.npy')
+        if not os.path.exists(ids_path):
+            return None
+        return cls(ids=np.load(ids_path, mmap_mode=mmap_mode),
+                   code_of=np.load(os.path.join(path, f'encoder-{name}-codes.npy'), mmap_mode=mmap_mode))
+
+
+def compile_encoders(le_dict):
+    """{부품 타입: LabelEncoder}를 {부품 타입: CompiledEncoder}로 변환"""
+    return {component: CompiledEncoder(le.classes_) for component, le in le_dict.items()}
@@ -0,0 +1,81 @@
+"""스크래퍼가 공유하는 선언형 스펙 추출 엔진
+
+카테고리마다 (필드 이름, 정규식, 변환 함수, 기본값) 목록을 선언하면
+SpecExtractor가 정규식을 모듈을 읽을 때 한 번만 컴파일해 두고, 스펙
+문자열마다 필드별 검색 → 그룹 선택 → 변환 → 기본값 처리를 한 루프로 한다.
+
+    CPU_SPEC = SpecExtractor([
+        Field('CoreCount', r"(\\d+)코어", default="N/A"),
+        Field('Socket', r"(AMD|인텔)\\(소켓[^)]+\\)", group=0, default="N/A"),
+    ])
+    CPU_SPEC.extract(spec)  # {'CoreCount': '8', 'Socket': 'AMD(소켓AM5)'}
+
+모든 필드를 하나의 교대(|) 패턴으로 합쳐 한 번만 훑는 방식도 재 보았으나,
+CPython re에서는 합친 패턴이 리터럴 접두사 최적화를 잃어 필드별 검색보다
+느렸다 (benchmarks/bench_extraction.py 참고).
+"""
+import re
+from collections import namedtuple
+
+# name: 결과 딕셔너리의 키
+# pattern: 정규식 (이름 있는 그룹이나 번호 역참조는 쓰지 않는다)
+# convert: 찾은 값에 적용할 함수 (None이면 그대로)
+# default: 찾지 못했을 때의 값
+# group: 값으로 쓸 그룹 번호 또는 번호 튜플 (None이면 그룹이 있을 때 1, 없을 때 0)
+# many: True이면 겹치지 않는 모든 매칭의 값 목록에 convert를 적용
+Field = namedtuple('Field', ['name', 'pattern', 'convert', 'default', 'group', 'many'],
+                   defaults=(None, None, None, False))
+
+# 제품 이름에서 지우는 표기
+NAME_NOISE = [r"^\d+\s+", r"\s*표준PC", r"\s*이벤트"]
+NON_DIGITS = re.compile(r"[^\d]")
+
+
+class SpecExtractor:
+    """필드 선언 목록을 컴파일해 둔 추출기"""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.plan = []
+        for field in self.fields:
+            pattern = re.compile(field.pattern)
+            group = field.group if field.group is not None else (1 if pattern.groups else 0)
+            groups = group if isinstance(group, tuple) else (group,)
+            search = pattern.finditer if field.many else pattern.search
+            self.plan.append((field.name, search, groups, field.convert, field.default, field.many))
+
+    def extract(self, text):
+        """text에서 모든 필드 값을 뽑아 {필드 이름: 값}으로 반환"""
+        result = {}
+        for name, search, groups, convert, default, many in self.plan:
+            if many:
+                value = [match.group(*groups) for match in search(text)] or None
+            else:
+                match = search(text)
+                value = match.group(*groups) if match else None
+            if value is None:
+                result[name] = default
+            else:
+                result[name] = convert(value) if convert else value
+        return result
+
+
+def name_cleaner(*extra):
+    """NAME_NOISE(와 추가 표기)를 한 번에 지우는 함수를 반환"""
+    pattern = re.compile('|'.join(NAME_NOISE + list(extra)))
+    return lambda name: pattern.sub("", name)
+
+
+clean_name = name_cleaner()
+
+
+def manufacturer_of(name):
+    """제품 이름의 첫 단어 (없으면 'Unknown')"""
+    words = name.split(None, 1)
+    return words[0] if words else "Unknown"
+
+
+def parse_price(text):
+    """'459,000원' 같은 가격 표기에서 숫자만 남겨 정수로 변환 (없으면 0)"""
+    digits = NON_DIGITS.sub("", text)
+    return int(digits) if digits else 0
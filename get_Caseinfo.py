@@ -1,77 +1,31 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import re
 import pandas as pd
-import psycopg2
+from loader import upsert_components
 from tabulate import tabulate
+from scraper import Category, run_category
+from extraction import SpecExtractor, Field, name_cleaner, manufacturer_of, parse_price
 
-chrome_options = Options()
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
+clean_name = name_cleaner(r"\s*다나와AS")
 
-driver = webdriver.Chrome(
-    service=Service(ChromeDriverManager().install()),
-    options=chrome_options
-)
+CASE_SPEC = SpecExtractor([
+    Field('Type', r"PC케이스\(([^)]+)\)", default="Unknown"),
+    Field('Dimensions', r"너비\(W\):\s*(\d+)mm\s*/\s*깊이\(D\):\s*(\d+)mm\s*/\s*높이\(H\):\s*(\d+)mm",
+          convert='x'.join, default="Unknown", group=(1, 2, 3)),
+    Field('MaxGPUlength', r"VGA 장착 길이:\s*(\d+)mm", int),
+    Field('SupportedFormFactors', r"(Extended-ATX|표준-ATX|Micro-ATX|Mini-ITX)", ', '.join, "Unknown", many=True),
+])
 
-driver.get('https://prod.danawa.com/list/?cate=112775')
-wait = WebDriverWait(driver, 10)
+def parse_product(product):
+    """목록의 제품 요소 하나에서 행 딕셔너리 목록을 추출"""
+    name = clean_name(product.text('prod_name'))
+    return [{
+        'Name': name,
+        'Manufacturer': manufacturer_of(name),
+        'Price': parse_price(product.text('price_sect')),
+        **CASE_SPEC.extract(product.text('spec_list')),
+    }]
 
-data = []
-
-try:
-    for i in range(1, 5):
-        wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'prod_main_info')))
-        products = driver.find_elements(By.CLASS_NAME, 'prod_main_info')
-        for product in products:
-            name = product.find_element(By.CLASS_NAME, 'prod_name').text
-            name = re.sub(r"^\d+\s+", "", name)
-            name = re.sub(r"\s*표준PC", "", name)
-            name = re.sub(r"\s*이벤트", "", name)
-            name = re.sub(r"\s*다나와AS", "", name)
-            manufacturer = name.split()[0] if name.split() else "Unknown"
-            
-            spec = product.find_element(By.CLASS_NAME, 'spec_list').text
-            type_match = re.search(r"PC케이스\(([^)]+)\)", spec)
-            dimensions_match = re.search(r"너비\(W\):\s*(\d+)mm\s*/\s*깊이\(D\):\s*(\d+)mm\s*/\s*높이\(H\):\s*(\d+)mm", spec)
-            gpu_length_match = re.search(r"VGA 장착 길이:\s*(\d+)mm", spec)
-            form_factors_match = re.findall(r"(Extended-ATX|표준-ATX|Micro-ATX|Mini-ITX)", spec)
-            
-            price = product.find_element(By.CLASS_NAME, 'price_sect').text
-            price = re.sub(r"[^\d]", "", price)
-            if price:
-              price = int(price)
-            else:
-              price = 0
-            
-            data.append({
-                'Name': name,
-                'Manufacturer': manufacturer,
-                'Price': price,
-                'Type': type_match.group(1) if type_match else "Unknown",
-                'Dimensions': f"{dimensions_match.group(1)}x{dimensions_match.group(2)}x{dimensions_match.group(3)}" if dimensions_match else "Unknown",
-                'MaxGPUlength': int(gpu_length_match.group(1)) if gpu_length_match else None,
-                'SupportedFormFactors': ', '.join(form_factors_match) if form_factors_match else "Unknown"
-            })
-
-        page_links = driver.find_element(By.CSS_SELECTOR, '#productListArea > div.prod_num_nav > div > div')
-        pages = page_links.find_elements(By.TAG_NAME, 'a')
-        if i < len(pages):
-            pages[i].click()
-        else:
-            print("전체 페이지 탐색 완료.")
-        wait.until(EC.staleness_of(pages[0]))
-
-except Exception as e:
-    print("크롤링/파싱 관련 에러:", str(e))
-finally:
-    driver.quit()
+def save_data(data):
+    """추출한 행을 정리하여 DB에 저장"""
     df = pd.DataFrame(data)
     
     df.replace({"": pd.NA, "N/A": pd.NA}, inplace=True)
@@ -90,32 +44,12 @@ finally:
     
     
     try:
-        connection = psycopg2.connect(
-            dbname='pc_builder_db',
-            user='eunsu',
-            password='asdf1234',
-            host='localhost',
-            port='5432'
-        )
-        cursor = connection.cursor()
-    
-        for _, row in components_df.iterrows():
-            cursor.execute(
-                "INSERT INTO components (name, manufacturer, price, type) VALUES (%s, %s, %s, %s) RETURNING componentid",
-                (row['Name'], row['Manufacturer'], row['Price'], row['Type'])
-            )
-            component_id = cursor.fetchone()[0]
-            case_data = cases_df.loc[_]
-            cursor.execute(
-                "INSERT INTO cases (componentid, type, dimensions, maxgpulength, supportedformfactors) VALUES (%s, %s, %s, %s, %s)",
-                (component_id, case_data['Type'], case_data['Dimensions'], case_data['MaxGPUlength'], case_data['SupportedFormFactors'])    
-            )
-        connection.commit()
-        print("데이터 삽입 완료")
+        result = upsert_components('Case', 'cases', components_df, cases_df)
+        print(f"데이터 저장 완료: {result.staged}개 중 신규 {result.inserted}개, 변경 {result.updated}개, 가격 이력 {result.price_history}행")
     except Exception as e:
         print(f"DB 관련 에러: {e}")
-    finally:
-        if connection:
-            cursor.close()
-            connection.close()
-            print("DB연결종료")
+
+CATEGORY = Category('Case', 'https://prod.danawa.com/list/?cate=112775', pages=4, parse_product=parse_product, save_data=save_data)
+
+if __name__ == '__main__':
+    run_category(CATEGORY)
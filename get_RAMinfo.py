@@ -1,72 +1,37 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import re
 import pandas as pd
-import psycopg2
+from loader import upsert_components
 from tabulate import tabulate
+from scraper import Category, run_category
+from extraction import SpecExtractor, Field, clean_name, manufacturer_of, parse_price
 
-chrome_options = Options()
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
+RAM_SPEC = SpecExtractor([
+    Field('MemorySpeed', r"(\d+)MHz", int),
+    Field('Type', r"DDR\d+"),
+])
 
-driver = webdriver.Chrome(
-    service=Service(ChromeDriverManager().install()),
-    options=chrome_options
-)
+# 용량별 가격 목록 (예: '16GB 45,000원')
+PRICE_LIST = SpecExtractor([
+    Field('Prices', r"(\d+)GB\s+(\d+,\d+)원", default=(), group=(1, 2), many=True),
+])
 
-driver.get('https://prod.danawa.com/list/?cate=112752')
-wait = WebDriverWait(driver, 10)
+def parse_product(product):
+    """목록의 제품 요소 하나에서 행 딕셔너리 목록을 추출"""
+    name = clean_name(product.text('prod_name'))
+    spec = RAM_SPEC.extract(product.text('spec_list'))
+    rows = []
+    for memory, price in PRICE_LIST.extract(product.text('prod_pricelist'))['Prices']:
+        memory_size = int(memory)
+        rows.append({
+            'Name': name,
+            'Manufacturer': manufacturer_of(name),
+            'Price': parse_price(price) * memory_size,
+            'MemorySize': memory_size,
+            **spec,
+        })
+    return rows
 
-data = []
-
-try:
-    for i in range(1, 11):
-        wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'prod_main_info')))
-        products = driver.find_elements(By.CLASS_NAME, 'prod_main_info')
-        for product in products:
-            name = product.find_element(By.CLASS_NAME, 'prod_name').text
-            name = re.sub(r"^\d+\s+", "", name)
-            name = re.sub(r"\s*표준PC", "", name)
-            name = re.sub(r"\s*이벤트", "", name)
-            manufacturer = name.split()[0] if name.split() else "Unknown"
-            
-            spec = product.find_element(By.CLASS_NAME, 'spec_list').text
-            memory_speed_match = re.search(r'(\d+)MHz', spec)
-            type_match = re.search(r'DDR\d+', spec)
-            
-            price_section = product.find_element(By.CLASS_NAME, 'prod_pricelist').text
-            price_match = re.findall(r'(\d+GB)\s+(\d+,\d+)원', price_section)
-            
-            for memory, price in price_match:
-                memory_size = int(re.search(r'\d+', memory).group())
-                price_value = int(re.sub(r'[^\d]', '', price))*memory_size
-                data.append({
-                    'Name': name,
-                    'Manufacturer': manufacturer,
-                    'Price': price_value,
-                    'MemorySize': memory_size,
-                    'MemorySpeed': int(memory_speed_match.group(1)) if memory_speed_match else None,
-                    'Type': type_match.group(0) if type_match else None
-                })
-
-        page_links = driver.find_element(By.CSS_SELECTOR, '#productListArea > div.prod_num_nav > div > div')
-        pages = page_links.find_elements(By.TAG_NAME, 'a')
-        if i < len(pages):
-            pages[i].click()
-        else:
-            print("전체 페이지 탐색 완료.")
-        wait.until(EC.staleness_of(pages[0]))
-
-except Exception as e:
-    print("크롤링/파싱 관련 에러:", str(e))
-finally:
-    driver.quit()
+def save_data(data):
+    """추출한 행을 정리하여 DB에 저장"""
     df = pd.DataFrame(data)
     
     df.replace({"": pd.NA, "N/A": pd.NA}, inplace=True)
@@ -85,32 +50,12 @@ finally:
     
     
     try:
-        connection = psycopg2.connect(
-            dbname='pc_builder_db',
-            user='eunsu',
-            password='asdf1234',
-            host='localhost',
-            port='5432'
-        )
-        cursor = connection.cursor()
-    
-        for _, row in components_df.iterrows():
-            cursor.execute(
-                "INSERT INTO components (name, manufacturer, price, type) VALUES (%s, %s, %s, %s) RETURNING componentid",
-                (row['Name'], row['Manufacturer'], float(row['Price']), row['Type'])
-            )
-            component_id = cursor.fetchone()[0]
-            ram_data = rams_df.loc[_]
-            cursor.execute(
-                "INSERT INTO rams (componentid, memorysize, memoryspeed, type) VALUES (%s, %s, %s, %s)",
-                (component_id, int(ram_data['MemorySize']), float(ram_data['MemorySpeed']), ram_data['Type'])
-            )
-        connection.commit()
-        print("데이터 삽입 완료")
+        result = upsert_components('RAM', 'rams', components_df, rams_df, key_columns=['MemorySize'])
+        print(f"데이터 저장 완료: {result.staged}개 중 신규 {result.inserted}개, 변경 {result.updated}개, 가격 이력 {result.price_history}행")
     except Exception as e:
         print(f"DB 관련 에러: {e}")
-    finally:
-        if connection:
-            cursor.close()
-            connection.close()
-            print("DB연결종료")
+
+CATEGORY = Category('RAM', 'https://prod.danawa.com/list/?cate=112752', pages=10, parse_product=parse_product, save_data=save_data)
+
+if __name__ == '__main__':
+    run_category(CATEGORY)
@@ -0,0 +1,136 @@
+"""여러 작업 프로세스로 서비스를 실행하는 gunicorn 설정
+
+    gunicorn app:app
+
+카탈로그는 마스터가 띄우는 로더 프로세스(catalog_store.py --watch) 하나만
+DB에서 읽어 catalog_store에 게시하고, 예산 구간 표도 마스터가 띄우는 프로세스
+(tiers.py --watch) 하나가 만들어 저장한다. 작업 프로세스들은 게시된 배열과
+모델 저장소의 배열을 mmap으로 열어 같은 물리 메모리를 함께 쓴다.
+작업 프로세스 수를 늘려도 프로세스마다 늘어나는 메모리는 호환 그룹과
+요청 처리에 쓰는 만큼으로 거의 일정하다. 두 프로세스가 종료되면 마스터가
+잠시 기다렸다가 다시 띄운다 (연달아 종료되면 대기 시간을 늘림).
+
+환경 변수
+    WEB_WORKERS         작업 프로세스 수 (기본: CPU 수)
+    WEB_BIND            바인드 주소 (기본 0.0.0.0:5000)
+    CATALOG_SHARED_DIR  공유 카탈로그 저장소 디렉터리 (기본 catalog_store)
+    METRICS_MULTIPROC_DIR  작업 프로세스별 계측 값을 모아 /metrics에서 합칠
+                           디렉터리 (기본 metrics_multiproc, 시작할 때 비움)
+"""
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count()))
+threads = 4
+# 가장 오래 걸리는 요청(구간 표 없이 예산 MAX_BATCH_BUDGETS개를 계산하는 배치)도
+# 1초 안팎이므로, 이 시간을 넘기면 멈춘 작업 프로세스로 보고 다시 띄운다 (초)
+timeout = 30
+# 앱을 마스터에서 미리 읽으면 카탈로그 갱신 타이머 같은 스레드가 fork 뒤에
+# 사라지므로, 작업 프로세스마다 따로 읽는다 (큰 배열은 어차피 mmap으로 공유).
+preload_app = False
+
+# 작업 프로세스가 상속하는 환경 변수
+os.environ.setdefault('CATALOG_SHARED_DIR', 'catalog_store')
+CATALOG_SHARED_DIR = os.environ['CATALOG_SHARED_DIR']
+# 작업 프로세스에만 넘긴다 (로더와 구간 표 프로세스의 값은 서비스 계측에 섞지 않음)
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', 'metrics_multiproc')
+
+# 로더가 첫 스냅샷을 게시할 때까지 기다리는 최대 시간 (초)
+LOADER_START_TIMEOUT = 120
+
+# 종료된 로더/구간 표 프로세스를 다시 띄우기 전 대기 시간 (초). 연달아 종료되면
+# 두 배씩 늘려 RESTART_MAX_DELAY까지 기다리고, RESTART_RESET_AFTER 이상 돌았으면 처음으로 되돌림
+RESTART_DELAY = 1
+RESTART_MAX_DELAY = 60
+RESTART_RESET_AFTER = 300
+# 종료할 때 로더/구간 표 프로세스가 끝나기를 기다리는 시간 (초, 넘으면 강제 종료)
+CHILD_STOP_TIMEOUT = 10
+
+# 이름 → {"args", "process", "started", "delay", "restart_at"}
+_processes = {}
+_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+def _spawn(name, args):
+    with _lock:
+        if _stopping.is_set():
+            return None
+        entry = _processes.setdefault(name, {"args": args, "delay": RESTART_DELAY})
+        entry.update(process=subprocess.Popen(args), started=time.monotonic(), restart_at=None)
+        return entry["process"]
+
+
+def _supervise(server):
+    """로더와 구간 표 프로세스가 종료되면 대기 시간 뒤에 다시 띄움"""
+    while not _stopping.wait(1):
+        for name, entry in list(_processes.items()):
+            # gunicorn 마스터가 자식 프로세스를 먼저 거두면 종료 코드는 0으로 보인다
+            code = entry["process"].poll()
+            if code is None:
+                continue
+            now = time.monotonic()
+            if entry["restart_at"] is None:
+                if now - entry["started"] >= RESTART_RESET_AFTER:
+                    entry["delay"] = RESTART_DELAY
+                entry["restart_at"] = now + entry["delay"]
+                server.log.warning(f"{name} exited with {code}, restarting in {entry['delay']}s")
+                entry["delay"] = min(entry["delay"] * 2, RESTART_MAX_DELAY)
+            elif now >= entry["restart_at"]:
+                _spawn(name, entry["args"])
+
+
+def on_starting(server):
+    """작업 프로세스를 띄우기 전에 카탈로그 로더를 시작하고 첫 게시를 기다림 (구간 표 생성도 시작)"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    # 이전 실행의 프로세스별 계측 파일이 합쳐지지 않도록 비운다
+    shutil.rmtree(METRICS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(METRICS_MULTIPROC_DIR)
+    current = os.path.join(CATALOG_SHARED_DIR, 'CURRENT')
+    started = time.monotonic()
+    previous = os.path.getmtime(current) if os.path.exists(current) else None
+    loader = _spawn('catalog loader', [sys.executable, os.path.join(root, 'catalog_store.py'), '--watch',
+                                       '--root', CATALOG_SHARED_DIR])
+    published = False
+    while time.monotonic() - started < LOADER_START_TIMEOUT:
+        if os.path.exists(current) and os.path.getmtime(current) != previous:
+            server.log.info(f"Shared catalog published in {CATALOG_SHARED_DIR}")
+            published = True
+            break
+        if loader.poll() is not None:
+            break
+        time.sleep(0.5)
+    if not published:
+        # 로더가 실패해도 작업 프로세스는 이전 스냅샷이나 DB에서 직접 읽어 동작한다
+        server.log.warning("Catalog loader did not publish a snapshot, workers fall back to the last one or the database")
+    # 표가 만들어질 때까지 작업 프로세스는 직접 계산한다
+    _spawn('tier builder', [sys.executable, os.path.join(root, 'tiers.py'), '--watch'])
+    threading.Thread(target=_supervise, args=(server,), name='supervisor', daemon=True).start()
+
+
+def post_fork(server, worker):
+    # 작업 프로세스는 fork 뒤에 앱(과 metrics)을 읽으므로 여기서 설정하면 된다
+    os.environ['METRICS_MULTIPROC_DIR'] = METRICS_MULTIPROC_DIR
+
+
+def on_exit(server):
+    with _lock:
+        _stopping.set()
+        processes = [entry["process"] for entry in _processes.values()]
+    # 모두에게 먼저 종료를 알리고 기다려야 하나가 멈춰 있어도 나머지가 남지 않는다
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=CHILD_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            server.log.warning(f"Process {process.pid} did not stop in {CHILD_STOP_TIMEOUT}s, killing it")
+            process.kill()
+            process.wait()
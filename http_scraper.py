@@ -0,0 +1,131 @@
+"""브라우저 없이 다나와 목록 페이지를 HTTP로 받아 lxml로 파싱하는 크롤링 백엔드
+
+SeleniumBackend와 같은 crawl_page(카테고리, 페이지) / close() 인터페이스를
+가지므로 crawl_categories(..., backend=HttpBackend())로 바꿔 끼울 수 있다.
+제품 요소는 HtmlProduct로 감싸 parse_product에 넘기며, text(클래스 이름)은
+Selenium의 .text와 같은 모양(블록 요소마다 줄바꿈, 공백 정리)의 문자열을 돌려준다.
+
+저장해 둔 목록 HTML을 오프라인으로 파싱해 볼 수 있다.
+    python http_scraper.py CPU saved_cpu_page.html
+"""
+import re
+import threading
+import requests
+import lxml.html
+
+REQUEST_TIMEOUT = 10
+# 목록의 page번째 페이지 주소 (카테고리 url에 페이지 번호를 붙이는 방식)
+# 사이트가 이 파라미터를 무시하면 같은 목록이 반복되는데, crawl_categories가
+# 앞 페이지와 같은 목록을 받은 곳에서 멈추므로 중복 행은 저장되지 않는다.
+PAGE_URL = '{url}&page={page}'
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Accept-Language': 'ko-KR,ko;q=0.9',
+}
+
+# 텍스트를 뽑을 때 앞뒤로 줄을 바꾸는 태그 (브라우저의 블록 요소)
+BLOCK_TAGS = frozenset(['div', 'p', 'li', 'dd', 'dt', 'ul', 'ol', 'dl', 'tr', 'br', 'h1', 'h2', 'h3', 'h4', 'table'])
+SPACES = re.compile(r'[ \t\r\f\v\xa0]+')
+
+
+def _visible_text(element):
+    """요소의 텍스트를 브라우저에 보이는 모양으로 추출"""
+    parts = []
+
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in ('script', 'style'):
+            return
+        block = node.tag in BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append('\n')
+
+    walk(element)
+    lines = (SPACES.sub(' ', line).strip() for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+class HtmlProduct:
+    """lxml 제품 요소를 parse_product의 추출 인터페이스로 감싼 객체"""
+
+    def __init__(self, element):
+        self.element = element
+
+    def text(self, class_name):
+        found = self.element.find_class(class_name)
+        if not found:
+            # Selenium의 NoSuchElementException처럼 요소가 없으면 예외를 낸다.
+            raise LookupError(f"'{class_name}' 요소를 찾을 수 없습니다.")
+        return _visible_text(found[0])
+
+
+def parse_list_html(html, category):
+    """목록 페이지 HTML에서 카테고리의 parse_product로 행 목록을 추출"""
+    document = lxml.html.fromstring(html)
+    rows = []
+    for product in document.find_class('prod_main_info'):
+        rows.extend(category.parse_product(HtmlProduct(product)))
+    return rows
+
+
+class HttpBackend:
+    """목록 페이지를 HTTP로 받아 파싱하는 크롤링 백엔드
+
+    작업 스레드마다 requests.Session을 하나씩 두어 연결(keep-alive)을 재사용한다.
+    """
+
+    def __init__(self, page_url=PAGE_URL, timeout=REQUEST_TIMEOUT):
+        self.page_url = page_url
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(HEADERS)
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def fetch(self, category, page):
+        """카테고리 목록의 page번째 페이지 HTML을 받아 반환"""
+        url = category.url if page == 1 else self.page_url.format(url=category.url, page=page)
+        response = self.session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+    def crawl_page(self, category, page):
+        return parse_list_html(self.fetch(category, page), category)
+
+    def close(self):
+        for session in self._sessions:
+            session.close()
+        self._sessions = []
+
+
+if __name__ == '__main__':
+    import argparse
+    from tabulate import tabulate
+    from scrape_all import CATEGORIES
+
+    categories = {category.name: category for category in CATEGORIES}
+    parser = argparse.ArgumentParser(description="저장해 둔 목록 페이지 HTML을 파싱하여 출력")
+    parser.add_argument('category', choices=sorted(categories), help="부품 카테고리 이름")
+    parser.add_argument('html_file', help="저장해 둔 목록 페이지 HTML 파일")
+    args = parser.parse_args()
+
+    with open(args.html_file, 'rb') as f:
+        rows = parse_list_html(f.read(), categories[args.category])
+    print(tabulate(rows, headers='keys', tablefmt='fancy_outline'))
+    print(f"{len(rows)}개 행 추출")
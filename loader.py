@@ -0,0 +1,226 @@
+"""스크래퍼가 추출한 부품을 components와 스펙 테이블에 한 번에 반영하는 벌크 로더
+
+행마다 INSERT를 두 번 보내는 대신, 추출한 행 전체를 COPY로 임시 스테이징
+테이블에 넣고 집합 단위 문장 하나로 upsert 한다. 부품은 (name, type)과
+타입별 키 스펙 컬럼(RAM 용량 등, 같은 이름의 변형을 구분)을 자연 키로 보고
+없는 부품만 새로 추가하므로 크롤링을 반복해도 components가 늘어나지 않는다.
+
+각 행에는 이름 + 스펙 값의 해시(fingerprint)를 붙여 두고, 이미 있는 부품은
+가격/제조사/fingerprint가 달라진 경우에만 갱신한다. 스펙 테이블은
+fingerprint가 바뀐 부품만 다시 쓰고, 가격이 바뀌면(새 부품은 첫 가격)
+price_history에 한 행을 남긴다. 무엇이든 바뀐 타입은 catalog_versions의
+버전을 올려, 카탈로그가 바뀐 타입만 다시 읽을 수 있게 한다.
+"""
+import csv
+import io
+import hashlib
+from collections import namedtuple
+from db import get_raw_connection, CATALOG_VERSIONS_SCHEMA
+
+# 스펙 테이블과 함께 upsert 하는 components 컬럼 (DataFrame 컬럼 순서)
+COMPONENT_COLUMNS = ['name', 'manufacturer', 'price']
+STAGING_TABLE = 'component_staging'
+
+# 적재 결과 (스테이징 행 수, 새 부품 수, 갱신된 부품 수, 가격 이력 행 수)
+LoadResult = namedtuple('LoadResult', ['staged', 'inserted', 'updated', 'price_history'])
+
+# 변경 감지에 필요한 컬럼과 테이블 (이미 있으면 그대로 둔다)
+SCHEMA = """
+ALTER TABLE components ADD COLUMN IF NOT EXISTS fingerprint text;
+CREATE TABLE IF NOT EXISTS price_history (
+    componentid integer NOT NULL,
+    price numeric NOT NULL,
+    recorded_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS price_history_componentid_idx ON price_history (componentid, recorded_at);
+""" + CATALOG_VERSIONS_SCHEMA + ";"
+
+# 스테이징 테이블은 대상 테이블의 컬럼 타입을 그대로 따라 만든다.
+CREATE_STAGING = """
+CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+SELECT {component_columns}, {spec_columns}, c.fingerprint
+FROM components c, {spec_table} s
+WITH NO DATA
+"""
+
+# 같은 자연 키가 여러 번 추출되면 가장 싼 행 하나만 반영한다.
+# 기존 부품 중복이 이미 있으면 가장 먼저 들어간 componentid를 갱신 대상으로 삼는다.
+# 새 부품의 componentid는 미리 nextval로 받아 두어 스테이징 행(seq)과 바로 짝짓는다.
+# 쓰기 CTE는 모두 같은 스냅샷을 보므로 스펙 행의 존재 여부는 spec_updated의 결과로 판단한다.
+UPSERT = """
+WITH src AS (
+    SELECT row_number() OVER () AS seq, d.* FROM (
+        SELECT DISTINCT ON (name{key_columns}) * FROM {staging} ORDER BY name{key_columns}, price
+    ) d
+), existing AS (
+    SELECT DISTINCT ON (src.seq) src.seq, c.componentid, c.manufacturer, c.price, c.fingerprint
+    FROM src JOIN components c ON c.name = src.name AND c.type = %(type)s
+    {key_join}
+    ORDER BY src.seq, c.componentid
+), updated AS (
+    UPDATE components c
+    SET manufacturer = src.manufacturer, price = src.price, fingerprint = src.fingerprint
+    FROM existing e JOIN src ON src.seq = e.seq
+    WHERE c.componentid = e.componentid
+      AND (e.price IS DISTINCT FROM src.price
+           OR e.manufacturer IS DISTINCT FROM src.manufacturer
+           OR e.fingerprint IS DISTINCT FROM src.fingerprint)
+    RETURNING c.componentid, src.seq,
+              e.price IS DISTINCT FROM src.price AS price_changed,
+              e.fingerprint IS DISTINCT FROM src.fingerprint AS spec_changed
+), new_ids AS (
+    SELECT src.seq, nextval(pg_get_serial_sequence('components', 'componentid')) AS componentid
+    FROM src WHERE NOT EXISTS (SELECT 1 FROM existing e WHERE e.seq = src.seq)
+), inserted AS (
+    INSERT INTO components (componentid, name, manufacturer, price, type, fingerprint)
+    SELECT n.componentid, src.name, src.manufacturer, src.price, %(type)s, src.fingerprint
+    FROM new_ids n JOIN src ON src.seq = n.seq
+), history AS (
+    INSERT INTO price_history (componentid, price)
+    SELECT u.componentid, src.price FROM updated u JOIN src ON src.seq = u.seq WHERE u.price_changed
+    UNION ALL
+    SELECT n.componentid, src.price FROM new_ids n JOIN src ON src.seq = n.seq
+    RETURNING componentid
+), ids AS (
+    SELECT componentid, seq FROM updated WHERE spec_changed
+    UNION ALL
+    SELECT componentid, seq FROM new_ids
+), spec_updated AS (
+    UPDATE {spec_table} s
+    SET ({spec_columns}) = ROW({src_spec_columns})
+    FROM ids JOIN src ON src.seq = ids.seq
+    WHERE s.componentid = ids.componentid
+    RETURNING s.componentid
+), spec_inserted AS (
+    INSERT INTO {spec_table} (componentid, {spec_columns})
+    SELECT ids.componentid, {src_spec_columns}
+    FROM ids JOIN src ON src.seq = ids.seq
+    WHERE NOT EXISTS (SELECT 1 FROM spec_updated u WHERE u.componentid = ids.componentid)
+), version AS (
+    INSERT INTO catalog_versions (type, version)
+    SELECT %(type)s, 1 WHERE EXISTS (SELECT 1 FROM updated) OR EXISTS (SELECT 1 FROM new_ids)
+    ON CONFLICT (type) DO UPDATE SET version = catalog_versions.version + 1, updated_at = now()
+)
+SELECT (SELECT count(*) FROM new_ids), (SELECT count(*) FROM updated), (SELECT count(*) FROM history)
+"""
+
+# 키 스펙 컬럼이 있을 때 기존 부품을 찾는 조인
+KEY_JOIN = "JOIN {spec_table} k ON k.componentid = c.componentid AND {conditions}"
+
+_schema_ready = False
+
+
+def _csv_value(value):
+    """COPY CSV 한 칸의 값 (빈 칸은 NULL)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # pandas가 정수 컬럼을 float로 바꿔 둔 경우 정수 컬럼에도 들어가도록 되돌린다.
+        return int(value)
+    return value
+
+
+def fingerprint(values):
+    """이름과 스펙 값으로 만든 행 해시 (가격은 포함하지 않는다)"""
+    text = '\x1f'.join('' if value is None else str(value) for value in values)
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
+def _copy_rows(rows):
+    """(이름, 제조사, 가격, 스펙 값...) 행을 fingerprint를 붙인 COPY CSV로 변환"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        values = [_csv_value(value) for value in row]
+        writer.writerow(values + [fingerprint(values[:1] + values[len(COMPONENT_COLUMNS):])])
+        count += 1
+    buffer.seek(0)
+    return buffer, count
+
+
+def _identifier(*names):
+    """SQL 식별자 인용 ('table.column' 형태도 가능)"""
+    return '.'.join('"' + name.replace('"', '""') + '"' for name in names)
+
+
+def _columns(columns, table=None):
+    """컬럼 목록을 'table.column, ...' 형태의 SQL 식별자 목록으로 변환"""
+    return ', '.join(_identifier(*((table, column) if table else (column,))) for column in columns)
+
+
+def _copy_from(cursor, statement, buffer):
+    """COPY ... FROM STDIN 실행 (psycopg2와 psycopg 3 드라이버 모두 지원)"""
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(statement, buffer)
+    else:
+        with cursor.copy(statement) as copy:
+            copy.write(buffer.getvalue())
+
+
+def ensure_schema(connection):
+    """변경 감지용 컬럼과 테이블을 만든다 (프로세스당 한 번, 별도 트랜잭션)"""
+    global _schema_ready
+    if not _schema_ready:
+        cursor = connection.cursor()
+        cursor.execute(SCHEMA)
+        connection.commit()
+        cursor.close()
+        _schema_ready = True
+
+
+def upsert_components(component_type, spec_table, components_df, spec_df, key_columns=()):
+    """추출한 부품을 components와 스펙 테이블에 upsert 하고 LoadResult를 반환
+
+    components_df는 Name, Manufacturer, Price 컬럼을, spec_df는 스펙 테이블
+    컬럼 이름(대소문자 무시)과 같은 컬럼을 같은 행 순서로 갖는다.
+    key_columns는 이름과 함께 자연 키가 되는 spec_df 컬럼이다.
+    """
+    spec_columns = [column.lower() for column in spec_df.columns]
+    key_columns = [column.lower() for column in key_columns]
+    rows = zip(
+        components_df[['Name', 'Manufacturer', 'Price']].itertuples(index=False, name=None),
+        spec_df.itertuples(index=False, name=None),
+    )
+    buffer, count = _copy_rows(component + spec for component, spec in rows)
+    if not count:
+        return LoadResult(0, 0, 0, 0)
+
+    staging = _identifier(STAGING_TABLE)
+    table = _identifier(spec_table)
+    key_join = ""
+    if key_columns:
+        key_join = KEY_JOIN.format(spec_table=table, conditions=" AND ".join(
+            f"{_identifier('k', column)} IS NOT DISTINCT FROM {_identifier('src', column)}" for column in key_columns
+        ))
+
+    connection = get_raw_connection()
+    try:
+        ensure_schema(connection)
+        cursor = connection.cursor()
+        # 같은 타입을 동시에 적재하면 둘 다 새 부품으로 넣을 수 있으므로 타입별로 직렬화한다.
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", ('components:' + component_type,))
+        cursor.execute(CREATE_STAGING.format(
+            staging=staging,
+            component_columns=_columns(COMPONENT_COLUMNS, 'c'),
+            spec_columns=_columns(spec_columns, 's'),
+            spec_table=table,
+        ))
+        _copy_from(cursor, f"COPY {staging} FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(UPSERT.format(
+            staging=staging,
+            key_columns="".join(", " + _identifier(column) for column in key_columns),
+            key_join=key_join,
+            spec_table=table,
+            spec_columns=_columns(spec_columns),
+            src_spec_columns=_columns(spec_columns, 'src'),
+        ), {'type': component_type})
+        inserted, updated, price_history = cursor.fetchone()
+        connection.commit()
+        cursor.close()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+    return LoadResult(count, inserted, updated, price_history)
@@ -0,0 +1,300 @@
+"""추천 경로 계측 (단계별 시간, 요청당 쿼리 수, 폴백 횟수, 예산 구간별 분포)
+
+프로세스 안의 카운터와 히스토그램을 모아 두었다가 /metrics에서 Prometheus
+텍스트 형식으로 내보낸다. 게이지(큐 길이 등)는 등록한 함수를 내보낼 때 읽는다. 요청 하나 동안의 값(단계 시간, 쿼리 수/시간)은
+스레드별로 따로 모아 요청이 끝날 때 히스토그램에 넣는다.
+
+    with metrics.request('recommend', budget=budget):
+        with metrics.stage('solve'):
+            ...
+        metrics.incr('recommend_fallback_total')
+
+여러 작업 프로세스로 실행할 때(gunicorn.conf.py)는 프로세스마다 METRICS_DUMP_INTERVAL
+초마다 자기 값을 METRICS_MULTIPROC_DIR/<pid>.json에 쓰고, /metrics를 받은
+프로세스가 모든 파일을 합쳐 내보낸다. 카운터와 히스토그램은 더하고(종료된
+프로세스의 값도 남겨 카운터가 줄지 않게 함), 게이지는 살아 있는 프로세스의
+값을 pid 라벨을 붙여 따로 내보낸다.
+
+환경 변수
+    METRICS_PROFILE_DIR     지정하면 X-Profile: 1 헤더가 붙은 요청을 cProfile로
+                            실행해 이 디렉터리에 .prof 파일로 남긴다 (기본: 끔)
+    METRICS_MULTIPROC_DIR   프로세스별 값을 모을 디렉터리 (gunicorn 작업 프로세스에서만
+                            설정됨, 기본: 이 프로세스의 값만 내보냄)
+"""
+import cProfile
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# 지연 시간 히스토그램 경계 (초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# 요청당 쿼리 수 히스토그램 경계
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50)
+# 예산 구간 경계 (원). 요청 수와 지연 시간을 이 구간별로 나눠 센다
+BUDGET_BUCKETS = (500000, 1000000, 1500000, 2000000, 3000000, 5000000, 10000000)
+
+PROFILE_DIR = os.environ.get('METRICS_PROFILE_DIR')
+MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_DUMP_INTERVAL = 5  # 초
+_profile_sequence = itertools.count()
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram과 같은 의미)"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{_labels(labels, le=bound)} {cumulative}'
+        yield f'{name}_sum{_labels(labels)} {self.sum}'
+        yield f'{name}_count{_labels(labels)} {self.count}'
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+def budget_bucket(budget):
+    """예산이 속하는 구간의 상한 라벨 ('1000000', ..., '+Inf')"""
+    index = bisect_left(BUDGET_BUCKETS, budget)
+    return str(BUDGET_BUCKETS[index]) if index < len(BUDGET_BUCKETS) else '+Inf'
+
+
+class Metrics:
+    """카운터, 히스토그램, 게이지 모음 (프로세스에 하나)
+
+    directory를 주면 start_dump()로 값을 주기적으로 파일에 쓰고, render는 그
+    디렉터리의 모든 프로세스 값을 합쳐 내보낸다.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._local = threading.local()
+        self._dumper = None
+
+    def incr(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def gauge(self, name, read, **labels):
+        """render 때마다 read()를 호출해 현재 값을 내보내는 게이지를 등록"""
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = read
+
+    def current(self):
+        """현재 스레드에서 진행 중인 요청의 값 (요청 밖이면 None)"""
+        return getattr(self._local, 'request', None)
+
+    @contextmanager
+    def request(self, endpoint, budget=None):
+        """요청 하나를 계측. 요청 동안의 단계 시간과 쿼리 수/시간을 모아 끝날 때 기록"""
+        current = {"stages": {}, "queries": 0, "query_seconds": 0.0}
+        self._local.request = current
+        start = time.perf_counter()
+        try:
+            yield current
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.request = None
+            labels = {"endpoint": endpoint}
+            if budget is not None:
+                labels["budget_le"] = budget_bucket(budget)
+            self.observe('request_seconds', elapsed, **labels)
+            self.observe('request_queries', current["queries"], QUERY_BUCKETS, endpoint=endpoint)
+            self.incr('db_query_seconds_total', current["query_seconds"], endpoint=endpoint)
+            for stage, seconds in current["stages"].items():
+                self.observe('stage_seconds', seconds, endpoint=endpoint, stage=stage)
+
+    @contextmanager
+    def stage(self, name):
+        """요청 안의 한 단계 시간을 잼 (같은 단계가 여러 번이면 합산)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current = self.current()
+            if current is not None:
+                current["stages"][name] = current["stages"].get(name, 0.0) + time.perf_counter() - start
+
+    def instrument_engine(self, engine):
+        """engine에서 실행되는 쿼리를 진행 중인 요청의 쿼리 수/시간에 더함"""
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info['metrics_started'] = time.perf_counter()
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.pop('metrics_started', None)
+            current = self.current()
+            if current is not None:
+                current["queries"] += 1
+                if started is not None:
+                    current["query_seconds"] += time.perf_counter() - started
+            self.incr('db_queries_total')
+
+        event.listen(engine, 'before_cursor_execute', before)
+        event.listen(engine, 'after_cursor_execute', after)
+
+    def _read_gauges(self):
+        with self._lock:
+            gauges = sorted(self._gauges.items(), key=lambda item: item[0])
+        # 게이지 함수는 다른 락을 잡을 수 있으므로 락 밖에서 읽는다
+        values = []
+        for key, read in gauges:
+            value = read()
+            if value is not None:
+                values.append((key, value))
+        return values
+
+    def dump(self):
+        """이 프로세스의 값을 directory/<pid>.json에 원자적으로 씀"""
+        with self._lock:
+            state = {
+                "counters": [[name, labels, value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, labels, h.buckets, h.counts, h.sum, h.count]
+                               for (name, labels), h in self._histograms.items()],
+            }
+        state["gauges"] = [[name, labels, value] for (name, labels), value in self._read_gauges()]
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    def start_dump(self, interval=METRICS_DUMP_INTERVAL):
+        """interval(초)마다 백그라운드에서 dump (directory가 없으면 아무것도 안 함)"""
+        if not self.directory or self._dumper is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.dump()
+                except Exception as e:
+                    logging.error(f"Metrics dump failed: {e}")
+
+        self._dumper = threading.Thread(target=loop, name='metrics-dump', daemon=True)
+        self._dumper.start()
+
+    def render(self):
+        """Prometheus 텍스트 형식으로 모든 값을 반환 (directory가 있으면 모든 프로세스 값을 합침)"""
+        if self.directory:
+            return self._render_merged()
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            lines = []
+            for (name, labels), value in counters:
+                lines.append(f'{name}{_labels(labels)} {value}')
+            for (name, labels), histogram in histograms:
+                lines.extend(histogram.lines(name, labels))
+        for (name, labels), value in self._read_gauges():
+            lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_merged(self):
+        self.dump()
+        counters, histograms, gauges = {}, {}, []
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping metrics file {filename}: {e}")
+                continue
+            for name, labels, value in state["counters"]:
+                key = (name, _label_key(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, buckets, counts, total, count in state["histograms"]:
+                key = (name, _label_key(labels))
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = Histogram(buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+            pid = int(filename[:-len('.json')])
+            if _alive(pid):
+                for name, labels, value in state["gauges"]:
+                    gauges.append(((name, _label_key(labels) + (('pid', pid),)), value))
+        lines = []
+        for (name, labels), value in sorted(counters.items()):
+            lines.append(f'{name}{_labels(labels)} {value}')
+        for (name, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+            lines.extend(histogram.lines(name, labels))
+        for (name, labels), value in sorted(gauges):
+            lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _label_key(labels):
+    """JSON에서 읽은 라벨 목록을 딕셔너리 키로 쓰는 튜플로 변환"""
+    return tuple((key, value) for key, value in labels)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@contextmanager
+def profiled(enabled, name):
+    """enabled이고 PROFILE_DIR이 설정되어 있으면 블록을 cProfile로 실행해 파일로 남김"""
+    if not enabled or not PROFILE_DIR:
+        yield None
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        filename = f"{name}-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{next(_profile_sequence)}.prof"
+        path = os.path.join(PROFILE_DIR, filename)
+        profile.dump_stats(path)
+
+
+metrics = Metrics(MULTIPROC_DIR)
+metrics.start_dump()
@@ -0,0 +1,416 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from encoders import CompiledEncoder, compile_encoders
+from versioned_store import stage_version, publish_version, current_version
+
+# 모델 버전들이 저장되는 디렉터리 (versioned_store 형식)
+MODEL_DIR = 'models'
+# 이전 형식(pickle) 모델 파일 (저장소에 모델이 없을 때만 사용)
+LEGACY_MODEL_PATH = 'pc_build_model.pkl'
+
+# 트리 배열 파일 이름 (모두 .npy로 저장되어 mmap으로 읽힘)
+FOREST_ARRAYS = [
+    'tree_offsets', 'children_left', 'children_right', 'feature', 'threshold',
+    'leaf_ptr', 'leaf_class', 'leaf_prob', 'classes',
+]
+
+# 동시 등장 모델 배열 파일 이름
+COOCCURRENCE_ARRAYS = ['slot_offsets', 'unigram', 'pair_keys', 'pair_counts']
+# 동시 등장 모델이 유지하는 최대 부품 쌍 수 (많이 함께 팔린 쌍부터 남김)
+MAX_PAIRS = 2000000
+
+# 저장소에서 읽어 온 모델 한 벌
+LoadedModel = namedtuple('LoadedModel', ['version', 'model', 'encoders'])
+
+
+class ForestModel:
+    """배열로 펼친 랜덤 포레스트 (sklearn 없이 predict/predict_proba 수행)
+
+    모든 트리의 노드를 하나의 배열에 이어 붙이고, 잎 노드의 클래스 분포는
+    0이 아닌 값만 CSR 형식(leaf_ptr, leaf_class, leaf_prob)으로 저장한다.
+    견적마다 클래스가 하나씩 생기는 모델에서 잎 노드는 대부분 클래스 하나만
+    가지므로, 노드 × 클래스 크기의 sklearn value 배열보다 훨씬 작다.
+    """
+
+    def __init__(self, arrays):
+        for name in FOREST_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.n_trees = len(self.tree_offsets) - 1
+
+    @classmethod
+    def from_sklearn(cls, forest, classes=None):
+        """학습된 RandomForestClassifier를 배열 형식으로 변환"""
+        offsets = [0]
+        left, right, feature, threshold = [], [], [], []
+        leaf_ptr, leaf_class, leaf_prob = [np.zeros(1, dtype=np.int64)], [], []
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            offset = offsets[-1]
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, -1, tree.children_left + offset))
+            right.append(np.where(is_leaf, -1, tree.children_right + offset))
+            feature.append(tree.feature)
+            threshold.append(tree.threshold)
+            # 잎 노드의 0이 아닌 클래스 비율만 노드 순서대로 모음
+            values = tree.value[:, 0, :]
+            nodes, classes_ = np.nonzero(values * is_leaf[:, None])
+            leaf_class.append(classes_)
+            leaf_prob.append(values[nodes, classes_] / values.sum(axis=1)[nodes])
+            counts = np.bincount(nodes, minlength=tree.node_count)
+            leaf_ptr.append(leaf_ptr[-1][-1] + np.cumsum(counts))
+            offsets.append(offset + tree.node_count)
+
+        return cls({
+            'tree_offsets': np.asarray(offsets, dtype=np.int64),
+            'children_left': np.concatenate(left).astype(np.int32),
+            'children_right': np.concatenate(right).astype(np.int32),
+            'feature': np.concatenate(feature).astype(np.int32),
+            'threshold': np.concatenate(threshold).astype(np.float64),
+            'leaf_ptr': np.concatenate(leaf_ptr).astype(np.int64),
+            'leaf_class': np.concatenate(leaf_class).astype(np.int32),
+            'leaf_prob': np.concatenate(leaf_prob).astype(np.float32),
+            'classes': np.asarray(forest.classes_ if classes is None else classes),
+        })
+
+    def with_classes(self, classes):
+        """클래스 목록을 classes(현재 클래스를 모두 포함하는 정렬된 배열)로 바꾼 포레스트"""
+        classes = np.asarray(classes)
+        arrays = {name: getattr(self, name) for name in FOREST_ARRAYS}
+        arrays['leaf_class'] = np.searchsorted(classes, self.classes[self.leaf_class]).astype(np.int32)
+        arrays['classes'] = classes
+        return ForestModel(arrays)
+
+    def trees(self, start, stop=None):
+        """start번째부터 stop번째 전까지의 트리만 남긴 포레스트"""
+        stop = self.n_trees if stop is None else stop
+        first, last = self.tree_offsets[start], self.tree_offsets[stop]
+        entry_first, entry_last = self.leaf_ptr[first], self.leaf_ptr[last]
+        children_left = np.asarray(self.children_left[first:last])
+        children_right = np.asarray(self.children_right[first:last])
+        return ForestModel({
+            'tree_offsets': self.tree_offsets[start:stop + 1] - first,
+            'children_left': np.where(children_left == -1, -1, children_left - first).astype(np.int32),
+            'children_right': np.where(children_right == -1, -1, children_right - first).astype(np.int32),
+            'feature': self.feature[first:last],
+            'threshold': self.threshold[first:last],
+            'leaf_ptr': self.leaf_ptr[first:last + 1] - entry_first,
+            'leaf_class': self.leaf_class[entry_first:entry_last],
+            'leaf_prob': self.leaf_prob[entry_first:entry_last],
+            'classes': self.classes,
+        })
+
+    @classmethod
+    def concat(cls, forests):
+        """클래스 목록이 같은 포레스트들의 트리를 하나로 합침"""
+        node_offset, entry_offset = 0, 0
+        parts = {name: [] for name in FOREST_ARRAYS}
+        parts['tree_offsets'].append(np.zeros(1, dtype=np.int64))
+        parts['leaf_ptr'].append(np.zeros(1, dtype=np.int64))
+        for forest in forests:
+            parts['tree_offsets'].append(forest.tree_offsets[1:] + node_offset)
+            for name in ('children_left', 'children_right'):
+                children = np.asarray(getattr(forest, name))
+                parts[name].append(np.where(children == -1, -1, children + node_offset))
+            parts['feature'].append(forest.feature)
+            parts['threshold'].append(forest.threshold)
+            parts['leaf_ptr'].append(forest.leaf_ptr[1:] + entry_offset)
+            parts['leaf_class'].append(forest.leaf_class)
+            parts['leaf_prob'].append(forest.leaf_prob)
+            node_offset += forest.tree_offsets[-1]
+            entry_offset += forest.leaf_ptr[-1]
+        arrays = {name: np.concatenate(items) for name, items in parts.items() if name != 'classes'}
+        for name in ('children_left', 'children_right', 'feature', 'leaf_class'):
+            arrays[name] = arrays[name].astype(np.int32)
+        arrays['classes'] = forests[-1].classes
+        return cls(arrays)
+
+    def apply(self, X):
+        """각 트리에서 X의 각 행이 도달하는 잎 노드 번호 (트리 수 × 행 수)"""
+        X = np.asarray(X, dtype=np.float32)
+        n = len(X)
+        nodes = np.repeat(self.tree_offsets[:-1], n)
+        rows = np.tile(np.arange(n), self.n_trees)
+        active = np.nonzero(self.children_left[nodes] != -1)[0]
+        while len(active):
+            current = nodes[active]
+            go_left = X[rows[active], self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, self.children_left[current], self.children_right[current])
+            active = active[self.children_left[nodes[active]] != -1]
+        return nodes.reshape(self.n_trees, n)
+
+    def _leaf_entries(self, X):
+        """X의 각 행이 도달한 잎들의 (행 번호, 클래스 코드, 비율) 항목"""
+        leaves = self.apply(X)
+        n = leaves.shape[1]
+        nodes = leaves.ravel()
+        rows = np.tile(np.arange(n), self.n_trees)
+        starts = self.leaf_ptr[nodes]
+        counts = self.leaf_ptr[nodes + 1] - starts
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        entries = np.repeat(starts, counts) + within
+        return n, np.repeat(rows, counts), self.leaf_class[entries], self.leaf_prob[entries]
+
+    def predict_proba(self, X):
+        """sklearn predict_proba와 같은 클래스 확률 (트리별 잎 분포의 평균)"""
+        n, rows, classes, probs = self._leaf_entries(X)
+        proba = np.zeros((n, len(self.classes)))
+        np.add.at(proba, (rows, classes), probs)
+        return proba / self.n_trees
+
+    def max_proba(self, X):
+        """predict_proba(X).max(axis=1)과 같은 값을 행 × 클래스 행렬 없이 계산
+
+        클래스가 견적 수만큼 많아도 메모리는 도달한 잎 항목 수에만 비례한다.
+        """
+        n, rows, classes, probs = self._leaf_entries(X)
+        keys, inverse = np.unique(rows * len(self.classes) + classes, return_inverse=True)
+        sums = np.bincount(inverse.ravel(), weights=probs)
+        result = np.zeros(n)
+        np.maximum.at(result, keys // len(self.classes), sums)
+        return result / self.n_trees
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def score_builds(self, X):
+        """조합(인코딩된 행)별 점수: 가장 비슷한 확정 견적의 확률"""
+        return self.max_proba(X)
+
+    def save(self, path):
+        for name in FOREST_ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        return cls({name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode) for name in FOREST_ARRAYS})
+
+
+class CooccurrenceModel:
+    """확정 견적에서 부품이 슬롯 쌍별로 함께 등장한 횟수를 세어 둔 모델
+
+    견적마다 클래스를 하나씩 두는 포레스트와 달리 크기가 견적 수가 아니라
+    (서로 다른 부품 쌍 수, 최대 MAX_PAIRS)에 비례하고, 조합의 점수는 타입
+    쌍마다 cos 유사도 count(a, b) / sqrt(count(a) count(b))를 조회해 평균한다
+    (학습에 없던 부품이 낀 쌍은 0). 부품 코드는 슬롯(COMPONENT_TYPES 순서)마다
+    slot_offsets만큼 밀어 하나의 코드 공간으로 합치고, 쌍은 정렬된 키 배열에서
+    이분 탐색으로 찾는다.
+    """
+
+    def __init__(self, arrays):
+        for name in COOCCURRENCE_ARRAYS:
+            setattr(self, name, arrays[name])
+        n_slots = len(self.slot_offsets) - 1
+        self._pairs = np.array([(i, j) for i in range(n_slots) for j in range(i + 1, n_slots)], dtype=np.int64)
+
+    @property
+    def n_codes(self):
+        return int(self.slot_offsets[-1])
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in COOCCURRENCE_ARRAYS)
+
+    @classmethod
+    def fit(cls, X, slot_sizes, max_pairs=MAX_PAIRS):
+        """인코딩된 견적 행렬 X(견적 수 × 슬롯 수)와 슬롯별 코드 수로 모델을 만듦"""
+        slot_offsets = _slot_offsets(slot_sizes)
+        unigram, keys, counts = _count_pairs(X, slot_offsets)
+        return cls._from_counts(slot_offsets, unigram, keys, counts, max_pairs)
+
+    def update(self, X, slot_sizes, max_pairs=MAX_PAIRS):
+        """기존 횟수에 새 견적 X의 횟수만 더한 모델을 반환
+
+        라벨이 늘어 슬롯별 코드 수(slot_sizes)가 커졌으면 기존 코드와 쌍 키를 새
+        코드 공간으로 옮긴 뒤 더한다 (기존 코드는 그대로이고 새 코드는 슬롯 끝에
+        붙으므로 슬롯마다 시작 위치만 밀린다). MAX_PAIRS로 잘려 나간 쌍의 횟수는
+        되살리지 않으므로, 잘린 적이 있으면 전체로 다시 학습한 모델과 조금 다를 수 있다.
+        """
+        old_offsets = np.asarray(self.slot_offsets, dtype=np.int64)
+        slot_offsets = _slot_offsets(slot_sizes)
+        if len(slot_offsets) != len(old_offsets) or np.any(np.diff(slot_offsets) < np.diff(old_offsets)):
+            raise ValueError("slot sizes can only grow")
+        old_n, n_codes = int(old_offsets[-1]), int(slot_offsets[-1])
+
+        # 기존 코드 → 새 코드 (슬롯 시작 위치가 밀린 만큼 더함)
+        shift = slot_offsets[:-1] - old_offsets[:-1]
+        remap = np.arange(old_n, dtype=np.int64) + np.repeat(shift, np.diff(old_offsets))
+        unigram = np.zeros(n_codes, dtype=np.float64)
+        unigram[remap] = self.unigram
+        pair_keys = np.asarray(self.pair_keys, dtype=np.int64)
+        keys = remap[pair_keys // old_n] * n_codes + remap[pair_keys % old_n] if old_n else pair_keys
+
+        new_unigram, new_keys, new_counts = _count_pairs(X, slot_offsets)
+        keys, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([self.pair_counts, new_counts]), minlength=len(keys))
+        return type(self)._from_counts(slot_offsets, unigram + new_unigram, keys, counts, max_pairs)
+
+    @classmethod
+    def _from_counts(cls, slot_offsets, unigram, keys, counts, max_pairs):
+        if len(keys) > max_pairs:
+            keep = np.argpartition(-counts, max_pairs - 1)[:max_pairs]
+            keys, counts = keys[keep], counts[keep]
+        order = np.argsort(keys)
+        return cls({
+            'slot_offsets': slot_offsets,
+            'unigram': np.asarray(unigram, dtype=np.float32),
+            'pair_keys': keys[order].astype(np.int64),
+            'pair_counts': counts[order].astype(np.float32),
+        })
+
+    def score_builds(self, X):
+        """조합(인코딩된 행)별 점수: 타입 쌍별 동시 등장 cos 유사도의 평균 (0~1)"""
+        X = np.asarray(X, dtype=np.int64)
+        if not len(self.pair_keys):
+            return np.zeros(len(X))
+        known = (X >= 0) & (X < np.diff(self.slot_offsets))
+        codes = np.where(known, X + self.slot_offsets[:-1], 0)
+        a, b = codes[:, self._pairs[:, 0]], codes[:, self._pairs[:, 1]]
+        keys = a * self.n_codes + b
+        index = np.minimum(np.searchsorted(self.pair_keys, keys), len(self.pair_keys) - 1)
+        found = known[:, self._pairs[:, 0]] & known[:, self._pairs[:, 1]] & (self.pair_keys[index] == keys)
+        counts = np.where(found, self.pair_counts[index], 0)
+        norms = np.sqrt(self.unigram[a] * self.unigram[b])
+        similarity = np.divide(counts, norms, out=np.zeros(counts.shape), where=norms > 0)
+        return similarity.mean(axis=1)
+
+    def save(self, path):
+        for name in COOCCURRENCE_ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        return cls({name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+                    for name in COOCCURRENCE_ARRAYS})
+
+
+def _slot_offsets(slot_sizes):
+    return np.concatenate([[0], np.cumsum(slot_sizes)]).astype(np.int64)
+
+
+def _count_pairs(X, slot_offsets):
+    """X의 코드별 등장 횟수와 (정렬되지 않은) 슬롯 쌍 키별 동시 등장 횟수"""
+    X = np.asarray(X, dtype=np.int64).reshape(-1, len(slot_offsets) - 1)
+    n_codes = int(slot_offsets[-1])
+    codes = X + slot_offsets[:-1]
+    codes[X < 0] = -1
+    unigram = np.bincount(codes[codes >= 0], minlength=n_codes).astype(np.float64)
+
+    keys, counts = [], []
+    n_slots = X.shape[1]
+    for i in range(n_slots):
+        for j in range(i + 1, n_slots):
+            known = (codes[:, i] >= 0) & (codes[:, j] >= 0)
+            pair_keys, pair_counts = np.unique(codes[known, i] * n_codes + codes[known, j], return_counts=True)
+            keys.append(pair_keys)
+            counts.append(pair_counts)
+    # 슬롯 쌍마다 키 범위가 겹치지 않으므로 이어 붙이면 키가 중복되지 않는다
+    keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+    counts = np.concatenate(counts).astype(np.float64) if counts else np.zeros(0)
+    return unigram, keys, counts
+
+
+# meta.json의 kind → 모델 클래스
+MODEL_KINDS = {"forest": ForestModel, "cooccurrence": CooccurrenceModel}
+
+
+def publish_model(model, le_dict, root=MODEL_DIR):
+    """학습된 모델과 라벨 인코더를 새 버전으로 저장하고 현재 버전으로 지정
+
+    le_dict의 값은 LabelEncoder 또는 라벨 목록(코드 순서)이다.
+
+    임시 디렉터리에 모두 쓴 뒤 이름을 바꾸고 CURRENT 파일을 원자적으로
+    교체하므로, 서비스는 절반만 쓰인 버전을 읽지 않는다.
+    """
+    version, staging = stage_version(root)
+
+    if not isinstance(model, (ForestModel, CooccurrenceModel)):
+        model = ForestModel.from_sklearn(model)
+    model.save(staging)
+    kind = "cooccurrence" if isinstance(model, CooccurrenceModel) else "forest"
+    encoders = {
+        component: [str(label) for label in getattr(le, 'classes_', le)]
+        for component, le in le_dict.items()
+    }
+    with open(os.path.join(staging, 'encoders.json'), 'w') as f:
+        json.dump(encoders, f)
+    # 작업 프로세스가 mmap으로 공유하는 조회 배열
+    for component, labels in encoders.items():
+        CompiledEncoder(labels).save(staging, component)
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        meta = {"kind": kind, "version": version, "components": list(encoders)}
+        if kind == "forest":
+            meta["n_trees"] = model.n_trees
+        json.dump(meta, f)
+
+    publish_version(root, version, staging)
+    return version
+
+
+def load_version(root, version):
+    """저장소의 특정 버전을 읽음 (모델과 인코더 배열은 mmap으로 열어 워커 간에 공유)"""
+    path = os.path.join(root, version)
+    with open(os.path.join(path, 'encoders.json')) as f:
+        labels = json.load(f)
+    # 인코더 배열이 없는 이전 버전은 라벨 목록에서 만든다
+    encoders = {component: CompiledEncoder.load(path, component) or CompiledEncoder(classes)
+                for component, classes in labels.items()}
+    with open(os.path.join(path, 'meta.json')) as f:
+        kind = json.load(f).get("kind", "forest")
+    return LoadedModel(version, MODEL_KINDS[kind].load(path), encoders)
+
+
+class ModelStore:
+    """모델을 처음 사용할 때 읽고, 새 버전이 게시되면 교체하는 저장소
+
+    check_interval(초)마다 CURRENT 파일을 확인하고, 버전이 바뀌었으면
+    새 모델을 모두 읽은 뒤 참조를 한 번에 바꾼다. 요청 처리 중에는
+    get()으로 받은 LoadedModel 하나를 계속 사용하면 된다.
+    """
+
+    def __init__(self, root=MODEL_DIR, check_interval=30, legacy_path=LEGACY_MODEL_PATH):
+        self.root = root
+        self.check_interval = check_interval
+        self.legacy_path = legacy_path
+        self._loaded = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        return current_version(self.root)
+
+    def get(self):
+        """현재 모델을 반환 (필요하면 읽거나 새 버전으로 교체)"""
+        loaded = self._loaded
+        if loaded is None or time.monotonic() - self._checked_at >= self.check_interval:
+            loaded = self.reload(force=False)
+        return loaded
+
+    def reload(self, force=True):
+        """CURRENT가 가리키는 버전을 읽어 교체 (force가 아니면 버전이 바뀐 경우에만)"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            version = self.current_version()
+            if self._loaded is not None and not force and self._loaded.version == (version or 'legacy'):
+                return self._loaded
+            if version is not None:
+                loaded = load_version(self.root, version)
+            else:
+                loaded = self._load_legacy()
+            if self._loaded is None or loaded.version != self._loaded.version:
+                logging.info(f"Model loaded: version {loaded.version}")
+            self._loaded = loaded
+            return loaded
+
+    def _load_legacy(self):
+        logging.warning(f"No published model in {self.root}, loading {self.legacy_path}")
+        with open(self.legacy_path, 'rb') as f:
+            model, le_dict = pickle.load(f)
+        return LoadedModel('legacy', model, compile_encoders(le_dict))
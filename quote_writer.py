@@ -0,0 +1,125 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+from db import QUOTE_ID_BLOCK_QUERY, INSERT_QUOTES_QUERY
+
+# 시퀀스에서 한 번에 미리 받아 두는 quoteid 수
+ID_BLOCK_SIZE = 100
+# 모인 견적이 이만큼 되거나 FLUSH_INTERVAL초가 지나면 한 번에 저장
+FLUSH_BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0  # 초
+
+
+class QuoteWriter:
+    """확정 견적을 모아 여러 행 INSERT로 저장하는 write-behind 큐
+
+    submit은 DB를 기다리지 않고 바로 quoteid를 반환한다. quoteid는
+    confirmed_quotes의 시퀀스에서 ID_BLOCK_SIZE개씩 미리 받아 둔 블록에서
+    꺼내므로, 저장되기 전에도 이후 저장될 행의 ID와 같다.
+    배경 스레드가 FLUSH_BATCH_SIZE개가 모이거나 FLUSH_INTERVAL초가 지날 때마다
+    모인 견적을 한 트랜잭션으로 저장하고, close()(프로세스 종료 시 atexit)는
+    남은 견적을 모두 저장한 뒤 끝난다. 저장에 실패한 견적은 큐에 남겨 다음
+    플러시에서 다시 시도한다.
+
+    배경 스레드와 ID 블록은 프로세스마다 따로 가져야 하므로, fork된 작업
+    프로세스에서는 첫 submit 때 새로 시작한다.
+    """
+
+    def __init__(self, engine, block_size=ID_BLOCK_SIZE, batch_size=FLUSH_BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.engine = engine
+        self.block_size = block_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._ids = deque()
+        self._id_lock = threading.Lock()
+        self._pending = []
+        self._flush_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        """현재 프로세스의 배경 스레드를 시작 (fork 후에는 부모의 ID 블록과 큐를 버림)"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._ids = deque()
+            self._pending = []
+            self._thread = threading.Thread(target=self._run, name='QuoteWriter', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _next_id(self):
+        with self._id_lock:
+            if not self._ids:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(QUOTE_ID_BLOCK_QUERY, {"count": self.block_size}).fetchall()
+                self._ids.extend(sorted(row[0] for row in rows))
+            return self._ids.popleft()
+
+    def submit(self, components):
+        """견적을 저장 큐에 넣고 미리 받아 둔 quoteid를 반환"""
+        self._ensure_started()
+        quoteid = self._next_id()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("QuoteWriter is closed")
+            self._pending.append({"quoteid": quoteid, "components": json.dumps(components)})
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return quoteid
+
+    def pending_count(self):
+        """아직 저장하지 않은 견적 수 (/metrics의 quote_writer_pending)"""
+        return len(self._pending)
+
+    def flush(self):
+        """모인 견적을 한 번에 저장 (실패하면 큐 앞쪽에 되돌림)"""
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(INSERT_QUOTES_QUERY, batch)
+            except Exception as e:
+                logging.error(f"Quote flush failed ({len(batch)} quotes kept for retry): {e}")
+                with self._condition:
+                    self._pending[:0] = batch
+                return 0
+            logging.debug(f"Flushed {len(batch)} confirmed quotes")
+            return len(batch)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self):
+        """새 견적을 받지 않고, 남은 견적을 모두 저장한 뒤 배경 스레드를 끝냄"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        if self._pid == os.getpid():
+            self._thread.join()
+        if self._pending:
+            self.flush()
+        if self._pending:
+            logging.error(f"{len(self._pending)} confirmed quotes could not be saved at shutdown")
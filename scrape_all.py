@@ -0,0 +1,37 @@
+import argparse
+import get_CPUinfo
+import get_GPUinfo
+import get_RAMinfo
+import get_Storageinfo
+import get_PSUinfo
+import get_Caseinfo
+import get_Motherboardinfo
+from scraper import crawl_categories, MAX_WORKERS, MAX_RETRIES
+
+CATEGORIES = [
+    get_CPUinfo.CATEGORY,
+    get_GPUinfo.CATEGORY,
+    get_RAMinfo.CATEGORY,
+    get_Storageinfo.CATEGORY,
+    get_PSUinfo.CATEGORY,
+    get_Caseinfo.CATEGORY,
+    get_Motherboardinfo.CATEGORY,
+]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="모든 부품 카테고리를 동시에 크롤링하여 저장")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help="동시에 처리할 최대 페이지 수 (브라우저 수)")
+    parser.add_argument('--http', action='store_true', help="브라우저 없이 HTTP로 목록 페이지를 받아 파싱")
+    parser.add_argument('--only', nargs='*', help="크롤링할 카테고리 이름 (예: CPU GPU)")
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES, help="페이지별 재시도 횟수")
+    parser.add_argument('--no-resume', action='store_true', help="저장된 페이지 체크포인트를 버리고 처음부터 크롤링")
+    args = parser.parse_args()
+
+    backend = None
+    if args.http:
+        from http_scraper import HttpBackend
+        backend = HttpBackend()
+
+    categories = [category for category in CATEGORIES if not args.only or category.name in args.only]
+    crawl_categories(categories, max_workers=args.workers, backend=backend,
+                     resume=not args.no_resume, retries=args.retries)
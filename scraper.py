@@ -0,0 +1,315 @@
+# selenium과 webdriver_manager는 SeleniumBackend를 쓸 때만 읽는다
+# (HttpBackend만 쓰는 환경에는 설치하지 않아도 된다)
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import json
+import time
+import random
+import shutil
+import threading
+
+# 동시에 처리하는 최대 페이지 수 (Selenium 백엔드에서는 동시에 띄우는 브라우저 수)
+MAX_WORKERS = 4
+WAIT_SECONDS = 10
+
+# 페이지 하나를 실패로 보기 전까지의 재시도 횟수와 대기 시간
+# (BACKOFF_SECONDS * 2^시도 + 지터, 최대 MAX_BACKOFF_SECONDS)
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 2
+MAX_BACKOFF_SECONDS = 60
+
+# 완료한 페이지의 추출 결과를 저장해 두는 디렉터리와 유효 시간 (초)
+CHECKPOINT_DIR = 'scrape_checkpoints'
+CHECKPOINT_MAX_AGE = 12 * 60 * 60
+PAGE_NAV_SELECTOR = '#productListArea > div.prod_num_nav > div > div'
+
+# 다나와 카테고리 하나의 크롤링 설정
+# parse_product(제품) → 행 딕셔너리 목록, save_data(행 목록) → DB 저장
+# parse_product가 받는 제품 객체는 text(클래스 이름)으로 하위 요소의 텍스트를 돌려준다.
+Category = namedtuple('Category', ['name', 'url', 'pages', 'parse_product', 'save_data'])
+
+
+class SeleniumProduct:
+    """Selenium 제품 요소를 parse_product의 추출 인터페이스로 감싼 객체"""
+
+    def __init__(self, element):
+        self.element = element
+
+    def text(self, class_name):
+        from selenium.webdriver.common.by import By
+
+        return self.element.find_element(By.CLASS_NAME, class_name).text
+
+
+def install_driver():
+    """크롬 드라이버를 한 번 설치하고 경로를 반환 (모든 브라우저가 공유)"""
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    return ChromeDriverManager().install()
+
+
+def create_driver(driver_path):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+
+def crawl_page(driver, category, page):
+    """카테고리 목록의 page번째 페이지를 열어 제품 정보를 추출"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    wait = WebDriverWait(driver, WAIT_SECONDS)
+    driver.get(category.url)
+    wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'prod_main_info')))
+    if page > 1:
+        page_links = driver.find_element(By.CSS_SELECTOR, PAGE_NAV_SELECTOR)
+        pages = page_links.find_elements(By.TAG_NAME, 'a')
+        if page > len(pages):
+            return []
+        pages[page - 1].click()
+        wait.until(EC.staleness_of(pages[0]))
+        wait.until(EC.presence_of_all_elements_located((By.CLASS_NAME, 'prod_main_info')))
+
+    rows = []
+    for product in driver.find_elements(By.CLASS_NAME, 'prod_main_info'):
+        rows.extend(category.parse_product(SeleniumProduct(product)))
+    return rows
+
+
+class BrowserPool:
+    """작업 스레드마다 브라우저를 하나씩 띄워 재사용하는 풀"""
+
+    def __init__(self, driver_path):
+        self.driver_path = driver_path
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            driver = self._local.driver = create_driver(self.driver_path)
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def close(self):
+        for driver in self._drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print("브라우저 종료 에러:", str(e))
+        self._drivers = []
+
+
+class SeleniumBackend:
+    """헤드리스 크롬으로 목록 페이지를 여는 크롤링 백엔드"""
+
+    def __init__(self, driver_path=None):
+        self.pool = BrowserPool(driver_path or install_driver())
+
+    def crawl_page(self, category, page):
+        return crawl_page(self.pool.get(), category, page)
+
+    def close(self):
+        self.pool.close()
+
+
+class PageCheckpoints:
+    """카테고리 하나의 페이지별 추출 결과를 디스크에 저장하는 체크포인트
+
+    <directory>/<카테고리 이름>/page_<번호>.json 에 행 목록을 저장한다.
+    max_age(초)보다 오래된 체크포인트는 없는 것으로 본다.
+    """
+
+    def __init__(self, directory, category_name, max_age=CHECKPOINT_MAX_AGE):
+        self.path = os.path.join(directory, category_name)
+        self.max_age = max_age
+
+    def _page_path(self, page):
+        return os.path.join(self.path, f'page_{page}.json')
+
+    def load(self, page):
+        """저장된 page의 행 목록 (없거나 오래되었으면 None)"""
+        path = self._page_path(page)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, page, rows):
+        """page의 행 목록을 원자적으로 저장"""
+        os.makedirs(self.path, exist_ok=True)
+        path = self._page_path(page)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def backoff_delay(attempt):
+    """attempt번째(0부터) 재시도 전 대기 시간 (지수 백오프 + 지터)"""
+    return min(BACKOFF_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.0)
+
+
+def crawl_with_retry(backend, category, page, retries=MAX_RETRIES):
+    """페이지 하나를 크롤링하고, 실패하면 지수 백오프로 최대 retries번 재시도"""
+    for attempt in range(retries + 1):
+        try:
+            return backend.crawl_page(category, page)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"[{category.name}] {page}페이지 실패 ({attempt + 1}/{retries + 1}), {delay:.1f}초 후 재시도:", str(e))
+            time.sleep(delay)
+
+
+def page_signature(rows):
+    """페이지의 제품 구성 (행의 제품 이름 순서). 같은 목록이 다시 오면 같은 값이다."""
+    return tuple(row.get('Name') for row in rows)
+
+
+def last_distinct_page(pages, limit):
+    """1페이지부터 이어진 페이지 중 바로 앞 페이지와 제품 구성이 같은 첫 페이지 직전 번호
+
+    사이트가 페이지 번호를 무시하고 같은 목록을 계속 돌려주면 그 뒤 페이지는
+    모두 중복이므로 거기서 멈춘다. 반복이 없으면 limit.
+    """
+    previous = None
+    for page in range(1, limit + 1):
+        if page not in pages:
+            break
+        signature = page_signature(pages[page])
+        if signature and signature == previous:
+            return page - 1
+        previous = signature
+    return limit
+
+
+def crawl_categories(categories, max_workers=MAX_WORKERS, backend=None, resume=True,
+                     checkpoint_dir=CHECKPOINT_DIR, retries=MAX_RETRIES):
+    """여러 카테고리를 페이지 단위로 나눠 작업 풀에서 동시에 크롤링
+
+    모든 카테고리의 1페이지, 2페이지, ... 순서로 작업을 넣으므로 카테고리들이
+    함께 진행되고, 한 카테고리의 페이지가 모두 끝나면 바로 save_data로 저장한다.
+    전체 소요 시간은 각 카테고리 시간의 합이 아니라 가장 느린 카테고리에 가깝다.
+    backend는 crawl_page(카테고리, 페이지)와 close()를 갖는 객체이며,
+    기본값은 SeleniumBackend이다.
+
+    어떤 페이지가 바로 앞 페이지와 같은 제품 목록이면(페이지 번호가 먹지 않아
+    같은 목록이 돌아오면) 그 카테고리는 앞 페이지까지만 저장하고, 아직 시작하지
+    않은 뒤 페이지 작업은 취소한다.
+
+    성공한 페이지는 checkpoint_dir에 저장하고, 페이지가 실패하면 지수 백오프로
+    retries번까지 재시도한다. 끝내 실패한 페이지가 있으면 나머지 페이지로 저장한
+    뒤 체크포인트를 남겨 두므로, 다시 실행하면(resume=True) 실패한 페이지만
+    크롤링한다. 모든 페이지가 성공하여 저장되면 체크포인트를 지운다.
+    """
+    checkpoints = {category.name: PageCheckpoints(checkpoint_dir, category.name) for category in categories}
+    results = {category.name: {} for category in categories}
+    failed = {category.name: [] for category in categories}
+    last_page = {category.name: category.pages for category in categories}
+    finished = set()
+    for category in categories:
+        if not resume:
+            checkpoints[category.name].clear()
+            continue
+        for page in range(1, category.pages + 1):
+            rows = checkpoints[category.name].load(page)
+            if rows is not None:
+                results[category.name][page] = rows
+        if results[category.name]:
+            print(f"[{category.name}] 체크포인트에서 {len(results[category.name])}페이지 복원")
+
+    def task(category, page):
+        if page > last_page[category.name]:
+            return []
+        try:
+            rows = crawl_with_retry(backend, category, page, retries)
+        except Exception as e:
+            print(f"[{category.name}] {page}페이지 크롤링/파싱 관련 에러:", str(e))
+            return None
+        checkpoints[category.name].save(page, rows)
+        return rows
+
+    def update_last_page(category):
+        """반복되는 페이지를 찾으면 마지막 페이지를 줄이고 True를 반환"""
+        last = last_distinct_page(results[category.name], last_page[category.name])
+        if last == last_page[category.name]:
+            return False
+        print(f"[{category.name}] {last + 1}페이지가 {last}페이지와 같은 목록이라 {last}페이지까지만 저장합니다.")
+        last_page[category.name] = last
+        return True
+
+    def complete(category):
+        return all(page in results[category.name] for page in range(1, last_page[category.name] + 1))
+
+    def finish(category):
+        finished.add(category.name)
+        last = last_page[category.name]
+        pages = results[category.name]
+        data = [row for page in sorted(pages) if page <= last for row in pages[page]]
+        failed_pages = sorted(page for page in failed[category.name] if page <= last)
+        if failed_pages:
+            print(f"[{category.name}] 실패한 페이지 {failed_pages}: 다시 실행하면 이 페이지만 크롤링합니다.")
+        print(f"[{category.name}] 전체 페이지 탐색 완료: {len(data)}개")
+        category.save_data(data)
+        if not failed_pages:
+            checkpoints[category.name].clear()
+
+    for category in categories:
+        update_last_page(category)
+    pending = [
+        (category, page)
+        for page in range(1, max(category.pages for category in categories) + 1)
+        for category in categories
+        if page <= last_page[category.name] and page not in results[category.name]
+    ]
+    for category in categories:
+        if complete(category):
+            finish(category)
+    if not pending:
+        return
+
+    backend = backend or SeleniumBackend()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(task, category, page): (category, page) for category, page in pending}
+            for future in as_completed(futures):
+                category, page = futures[future]
+                if future.cancelled() or category.name in finished:
+                    continue
+                rows = future.result()
+                if rows is None:
+                    failed[category.name].append(page)
+                    rows = []
+                results[category.name][page] = rows
+                if update_last_page(category):
+                    for other, (other_category, other_page) in futures.items():
+                        if other_category is category and other_page > last_page[category.name]:
+                            other.cancel()
+                if complete(category):
+                    finish(category)
+    finally:
+        backend.close()
+
+
+def run_category(category, max_workers=MAX_WORKERS, backend=None, resume=True):
+    """카테고리 하나를 크롤링하여 저장 (get_*info.py 단독 실행용)"""
+    crawl_categories([category], max_workers=min(max_workers, category.pages), backend=backend, resume=resume)
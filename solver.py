@@ -0,0 +1,168 @@
+import heapq
+from bisect import bisect_right
+from itertools import count as counter
+
+import numpy as np
+
+# 탐색할 최대 노드 수 (이 한도 안에서 찾은 최선의 조합을 반환)
+MAX_NODES = 20000
+
+
+class BuildInfeasibleError(ValueError):
+    """예산 안에서 모든 부품 타입을 채울 수 없는 경우"""
+
+
+def _frontier(positions, prices, scores, count=1):
+    """가격 오름차순 후보 배열에서 더 싸고 점수가 같거나 높은 후보가 count개 이상인 후보를 뺌
+
+    그런 부품을 쓰는 조합은 그 부품들로 바꾼 count개 이상의 서로 다른 조합보다
+    나을 수 없으므로 상위 count개에 들지 않는다. 남은 후보의 (위치, 가격, 점수)
+    목록과, 남은 점수가 가격과 함께 증가하는지를 반환한다.
+    """
+    n = len(scores)
+    if n == 0:
+        return [], [], [], True
+    if np.all(scores[1:] >= scores[:-1]):
+        # 점수가 가격순이면 앞의 후보 중 점수가 같거나 높은 것은 같은 점수의 후보뿐이므로
+        # 같은 점수 구간마다 앞의 count개만 남는다
+        index = np.arange(n)
+        first = np.maximum.accumulate(np.where(np.r_[True, scores[1:] != scores[:-1]], index, 0))
+        keep = index - first < count
+        monotone = True
+    else:
+        keep = np.zeros(n, dtype=bool)
+        top = []  # 지금까지 본 점수 중 상위 count개 (최소 힙)
+        for i, s in enumerate(scores.tolist()):
+            if len(top) < count:
+                keep[i] = True
+                heapq.heappush(top, s)
+            elif s > top[0]:
+                keep[i] = True
+                heapq.heapreplace(top, s)
+        monotone = count == 1
+    return positions[keep].tolist(), prices[keep].tolist(), scores[keep].tolist(), monotone
+
+
+def _unpruned(positions, prices, scores, count=1):
+    """다른 타입의 후보를 제한하는 타입은 가격이 같아도 호환성이 다르므로 모두 남김"""
+    return positions.tolist(), prices.tolist(), scores.tolist(), False
+
+
+def _columns(items, objective):
+    """후보를 가격 오름차순 (부품 목록, ID 배열, 가격 배열, 점수 배열)로 바꿈
+
+    items가 카탈로그의 뷰(ComponentRange)이면 이미 가격순이고 ID와 가격이 배열로
+    있으므로 objective가 없는 한 Component를 만들지 않는다.
+    """
+    if hasattr(items, 'prices'):
+        ids, prices = np.asarray(items.ids), np.asarray(items.prices, dtype=np.float64)
+    else:
+        items = sorted(items, key=lambda c: (c.price, c.id))
+        ids = np.array([c.id for c in items], dtype=np.int64)
+        prices = np.array([c.price for c in items], dtype=np.float64)
+    if objective is None:
+        scores = prices
+    else:
+        scores = np.array([objective(items[i]) for i in range(len(items))], dtype=np.float64)
+    return items, ids, prices, scores
+
+
+def solve_builds(candidates, budget, objective=None, compatibility=None, count=1, max_nodes=MAX_NODES):
+    """타입별 후보 목록에서 타입마다 하나씩 골라 예산 내 조합을 objective가 높은 순으로 최대 count개 찾음
+
+    candidates: {타입: [Component, ...] 또는 가격순 ComponentRange}
+    objective: None이면 총 가격(지출) 최대화, 함수이면 부품별 점수 합 최대화
+    compatibility: CompatibilityIndex (주어지면 호환되는 부품끼리만 조합)
+    반환값: [({타입: Component}, 총 가격), ...] (objective 내림차순)
+
+    다중 선택 배낭 문제를 분기 한정법으로 푼다. 탐색 노드 수가 max_nodes로
+    제한되므로 항상 유한한 시간 안에 끝나며, 조합이 불가능하면
+    BuildInfeasibleError를 발생시킨다. count개를 찾을 때는 지금까지 찾은 조합 중
+    count번째 점수를 한계값 비교 기준으로 쓴다. 후보는 가격/점수 배열의 위치로
+    다루고, Component는 탐색 중 실제로 고르는 후보만 꺼낸다.
+    """
+    constraining = compatibility.constraining if compatibility is not None else ()
+
+    groups = []
+    for type_, items in candidates.items():
+        if not len(items):
+            raise BuildInfeasibleError(f"No {type_} candidates within budget")
+        items, ids, prices, scores = _columns(items, objective)
+        prune = _unpruned if type_ in constraining else _frontier
+        full = prune(np.arange(len(ids)), prices, scores, count)
+        groups.append((type_, items, (ids, prices, scores), prune, full))
+    if compatibility is None:
+        # 선택지가 적은 타입부터 분기해야 트리가 작아진다
+        groups.sort(key=lambda g: len(g[4][0]))
+    else:
+        # 호환 조건을 정하는 타입(메인보드 등)을 먼저 골라야 뒤 타입을 거를 수 있다
+        order = {type_: i for i, type_ in enumerate(compatibility.order)}
+        groups.sort(key=lambda g: (order.get(g[0], len(order)), len(g[4][0])))
+
+    n = len(groups)
+    # 호환 조건으로 후보가 줄어도 최소 가격은 커지고 최대 점수는 작아지므로 한계값으로 유효하다
+    min_rest = [0.0] * (n + 1)  # k번째 이후 타입들의 최소 가격 합
+    max_rest = [0.0] * (n + 1)  # k번째 이후 타입들의 최대 점수 합
+    for k in range(n - 1, -1, -1):
+        _, prices, scores, _ = groups[k][4]
+        min_rest[k] = min_rest[k + 1] + prices[0]
+        max_rest[k] = max_rest[k + 1] + max(scores)
+
+    if min_rest[0] > budget:
+        raise BuildInfeasibleError(f"Cheapest build costs {min_rest[0]:.0f}, over budget {budget:.0f}")
+
+    filtered = {}  # (타입 순번, 허용 ID 집합) → 호환되는 후보
+
+    def options(k, chosen):
+        type_, _, (ids, prices, scores), prune, full = groups[k]
+        allowed = compatibility.allowed(type_, chosen) if compatibility is not None else None
+        if allowed is None:
+            return full
+        key = (k, allowed)
+        if key not in filtered:
+            mask = np.isin(ids, np.fromiter(allowed, dtype=np.int64, count=len(allowed)))
+            filtered[key] = prune(np.flatnonzero(mask), prices[mask], scores[mask], count)
+        return filtered[key]
+
+    # count번째로 좋은 조합이 맨 앞에 오는 최소 힙 (점수, 순번, 조합)
+    best = []
+    sequence = counter()
+    chosen = {}
+    nodes = 0
+
+    def search(k, remaining, current):
+        nonlocal nodes
+        if k == n:
+            entry = (current, next(sequence), dict(chosen))
+            if len(best) < count:
+                heapq.heappush(best, entry)
+            elif current > best[0][0]:
+                heapq.heapreplace(best, entry)
+            return
+        type_, items = groups[k][0], groups[k][1]
+        positions, prices, scores, monotone = options(k, chosen)
+        # 나머지 타입을 가장 싸게 채울 여유를 남긴 가격까지만 선택 가능
+        limit = bisect_right(prices, remaining - min_rest[k + 1])
+        # 비싼 부품부터 시도하면 첫 탐색이 곧 탐욕해가 된다
+        for i in range(limit - 1, -1, -1):
+            if nodes >= max_nodes:
+                return
+            s = scores[i]
+            bound = current + s + max_rest[k + 1]
+            if objective is None:
+                bound = min(bound, budget)
+            if len(best) == count and bound <= best[0][0]:
+                # 점수가 가격순이면 뒤의 후보는 모두 한계값이 더 낮다
+                if monotone or objective is None:
+                    break
+                continue
+            nodes += 1
+            chosen[type_] = items[positions[i]]
+            search(k + 1, remaining - prices[i], current + s)
+            del chosen[type_]
+
+    search(0, budget, 0.0)
+    if not best:
+        raise BuildInfeasibleError("No compatible build found within budget")
+
+    return [(build, sum(item.price for item in build.values())) for _, _, build in sorted(best, reverse=True)]
@@ -0,0 +1,56 @@
+"""여러 프로세스의 계측 값을 /metrics에서 합치는지 확인하는 테스트
+
+    python -m unittest discover tests
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metrics import Metrics
+
+
+def _worker(directory):
+    worker = Metrics(directory)
+    worker.incr('requests_total', 2, endpoint='recommend')
+    worker.observe('request_seconds', 0.3, endpoint='recommend')
+    worker.gauge('queue_pending', lambda: 7)
+    worker.dump()
+
+
+class MultiprocessMetricsTest(unittest.TestCase):
+
+    def test_merges_counters_and_histograms_across_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            process = multiprocessing.get_context('fork').Process(target=_worker, args=(directory,))
+            process.start()
+            process.join()
+
+            local = Metrics(directory)
+            local.incr('requests_total', 1, endpoint='recommend')
+            local.observe('request_seconds', 0.003, endpoint='recommend')
+            local.gauge('queue_pending', lambda: 3)
+            lines = local.render().splitlines()
+
+        # 카운터와 히스토그램은 종료된 프로세스의 값까지 더한다
+        self.assertIn('requests_total{endpoint="recommend"} 3', lines)
+        self.assertIn('request_seconds_count{endpoint="recommend"} 2', lines)
+        self.assertIn('request_seconds_bucket{endpoint="recommend",le="0.005"} 1', lines)
+        self.assertIn('request_seconds_bucket{endpoint="recommend",le="0.5"} 2', lines)
+        # 게이지는 살아 있는 프로세스의 값만 pid 라벨을 붙여 내보낸다
+        self.assertEqual([line for line in lines if line.startswith('queue_pending')],
+                         [f'queue_pending{{pid="{os.getpid()}"}} 3'])
+
+    def test_single_process_without_directory(self):
+        local = Metrics()
+        local.incr('requests_total')
+        local.gauge('queue_pending', lambda: None)
+        self.assertEqual(local.render(), 'requests_total 1\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
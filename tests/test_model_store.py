@@ -0,0 +1,44 @@
+"""동시 등장 모델의 증분 갱신이 전체 학습과 같은지 확인하는 테스트
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_store import CooccurrenceModel, COOCCURRENCE_ARRAYS
+
+
+class CooccurrenceUpdateTest(unittest.TestCase):
+
+    def assert_same_model(self, got, expected):
+        for name in COOCCURRENCE_ARRAYS:
+            np.testing.assert_array_equal(getattr(got, name), getattr(expected, name), err_msg=name)
+
+    def test_update_matches_full_fit_when_labels_grow(self):
+        rng = np.random.default_rng(7)
+        old_sizes = [5, 4, 6]
+        new_sizes = [7, 4, 9]  # 새 견적에서 슬롯 0과 2의 라벨이 늘어남
+        old_X = np.stack([rng.integers(size, size=200) for size in old_sizes], axis=1)
+        new_X = np.stack([rng.integers(size, size=80) for size in new_sizes], axis=1)
+        old_X[::17, 1] = -1  # 부품이 빠진 견적
+
+        updated = CooccurrenceModel.fit(old_X, old_sizes).update(new_X, new_sizes)
+        full = CooccurrenceModel.fit(np.concatenate([old_X, new_X]), new_sizes)
+
+        self.assert_same_model(updated, full)
+        np.testing.assert_allclose(updated.score_builds(new_X[:20]), full.score_builds(new_X[:20]))
+
+    def test_update_rejects_shrinking_slots(self):
+        model = CooccurrenceModel.fit(np.zeros((3, 2), dtype=np.int64), [3, 3])
+        with self.assertRaises(ValueError):
+            model.update(np.zeros((1, 2), dtype=np.int64), [2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
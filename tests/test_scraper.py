@@ -0,0 +1,81 @@
+"""목록 페이지 파싱과 페이지 반복 감지 테스트
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scraper import Category, crawl_categories
+from http_scraper import parse_list_html
+import get_CPUinfo
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class ParseListHtmlTest(unittest.TestCase):
+
+    def test_cpu_list_page(self):
+        with open(os.path.join(FIXTURES, 'danawa_cpu_list.html'), 'rb') as f:
+            rows = parse_list_html(f.read(), get_CPUinfo.CATEGORY)
+
+        self.assertEqual([row['Price'] for row in rows], [459000, 128900, 103500])
+        self.assertEqual([row['Socket'] for row in rows], ['AMD(소켓AM5)', '인텔(소켓1700)', 'AMD(소켓AM4)'])
+        first = rows[0]
+        self.assertTrue(first['Name'].startswith('AMD 라이젠7-5세대 7800X3D'))
+        self.assertEqual(first['Manufacturer'], 'AMD')
+        self.assertEqual((first['CoreCount'], first['ThreadCount']), ('8', '16'))
+        self.assertEqual((first['BaseClock'], first['BoostClock']), ('4.2', '5.0'))
+        self.assertEqual(rows[1]['Manufacturer'], 'Intel')
+
+
+class FakeBackend:
+    """pages[페이지]의 제품 이름 목록을 행으로 돌려주는 백엔드 (없는 페이지는 마지막 페이지 반복)"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def crawl_page(self, category, page):
+        self.requested.append(page)
+        time.sleep(0.01)
+        names = self.pages.get(page, self.pages[max(self.pages)])
+        return [{'Name': name} for name in names]
+
+    def close(self):
+        pass
+
+
+class RepeatedPageTest(unittest.TestCase):
+
+    def crawl(self, backend, pages):
+        saved = []
+        category = Category('Test', 'https://example.com/list/?cate=1', pages,
+                            parse_product=None, save_data=saved.append)
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            crawl_categories([category], max_workers=1, backend=backend, checkpoint_dir=checkpoint_dir, retries=0)
+        self.assertEqual(len(saved), 1)
+        return [row['Name'] for row in saved[0]]
+
+    def test_stops_when_page_repeats_previous(self):
+        # 마지막 페이지(2) 뒤의 페이지 번호에 2페이지 목록이 그대로 오는 경우:
+        # 3페이지가 2페이지와 같으므로 2페이지까지만 저장한다
+        backend = FakeBackend({1: ['a', 'b'], 2: ['c', 'd']})
+        names = self.crawl(backend, pages=10)
+
+        self.assertEqual(names, ['a', 'b', 'c', 'd'])
+        # 반복을 알아챈 뒤의 페이지는 요청하지 않는다
+        self.assertLess(len(backend.requested), 10)
+
+    def test_keeps_all_distinct_pages(self):
+        backend = FakeBackend({1: ['a'], 2: ['b'], 3: ['c']})
+        self.assertEqual(self.crawl(backend, pages=3), ['a', 'b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""solve_builds의 상위 count개 결과를 전수 탐색과 비교하는 테스트
+
+    python -m unittest discover tests
+"""
+import itertools
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from catalog import Component, TypeIndex, COMPONENT_TYPES
+from compatibility import CompatibilityIndex, COMPATIBILITY_ORDER
+from solver import solve_builds, BuildInfeasibleError
+
+SOCKETS = ["AMD(소켓AM5)", "인텔(소켓1700)"]
+MEMORY_TYPES = ["DDR4", "DDR5"]
+FORM_FACTORS = [("ATX", "표준-ATX, Micro-ATX"), ("M-ATX", "Micro-ATX")]
+
+
+def random_catalog(rng, per_type):
+    """가격이 10000원 단위라 같은 가격(같은 점수)이 자주 나오는 작은 카탈로그"""
+    candidates = {}
+    componentid = itertools.count(1)
+    for type_ in COMPONENT_TYPES:
+        candidates[type_] = [
+            Component(next(componentid), f"{type_} {i}", float(rng.randint(1, 8) * 10000), type_)
+            for i in range(per_type)
+        ]
+    specs = {
+        "cpus": [(c.id, rng.choice(SOCKETS)) for c in candidates["CPU"]],
+        "motherboards": [(c.id, rng.choice(SOCKETS), rng.choice(FORM_FACTORS)[0], rng.choice(MEMORY_TYPES))
+                         for c in candidates["Motherboard"]],
+        "rams": [(c.id, rng.choice(MEMORY_TYPES)) for c in candidates["RAM"]],
+        "cases": [(c.id, rng.choice([250, 300, 350]), rng.choice(FORM_FACTORS)[1]) for c in candidates["Case"]],
+        "gpus": [(c.id, rng.choice([240, 290, 340]), rng.choice([150, 250, 350])) for c in candidates["GPU"]],
+        "psus": [(c.id, rng.choice([300, 500, 700])) for c in candidates["PSU"]],
+    }
+    return candidates, CompatibilityIndex(**specs)
+
+
+def brute_force(candidates, budget, score, compatibility, count):
+    """예산 내 호환되는 모든 조합의 점수를 높은 순으로 count개"""
+    types = list(candidates)
+    scores = []
+    for combination in itertools.product(*(candidates[type_] for type_ in types)):
+        build = dict(zip(types, combination))
+        if sum(c.price for c in combination) > budget:
+            continue
+        if compatibility is not None:
+            chosen = {}
+            compatible = True
+            for type_ in sorted(types, key=COMPATIBILITY_ORDER.index):
+                allowed = compatibility.allowed(type_, chosen)
+                if allowed is not None and build[type_].id not in allowed:
+                    compatible = False
+                    break
+                chosen[type_] = build[type_]
+            if not compatible:
+                continue
+        scores.append(sum(score(c) for c in combination))
+    return sorted(scores, reverse=True)[:count]
+
+
+class SolveBuildsTest(unittest.TestCase):
+
+    def check(self, trials, objective=None, with_compatibility=True, count=5):
+        rng = random.Random(32)
+        score = objective or (lambda c: c.price)
+        for trial in range(trials):
+            candidates, compatibility = random_catalog(rng, per_type=4)
+            if not with_compatibility:
+                compatibility = None
+            budget = float(rng.randint(25, 45) * 10000)
+            expected = brute_force(candidates, budget, score, compatibility, count)
+            try:
+                builds = solve_builds(candidates, budget, objective, compatibility, count)
+            except BuildInfeasibleError:
+                self.assertEqual(expected, [], f"trial {trial}")
+                continue
+            got = [sum(score(c) for c in build.values()) for build, _ in builds]
+            self.assertEqual(got, expected, f"trial {trial}")
+            self.assertEqual(len({tuple(c.id for c in build.values()) for build, _ in builds}), len(builds))
+            self.assertTrue(all(total <= budget for _, total in builds))
+
+    def test_top_count_spend(self):
+        self.check(120)
+
+    def test_top_count_spend_without_compatibility(self):
+        self.check(40, with_compatibility=False)
+
+    def test_top_count_objective(self):
+        self.check(60, objective=lambda c: (c.id * 7919) % 13)
+
+    def test_single_best(self):
+        self.check(40, count=1)
+
+    def test_component_range_matches_list(self):
+        rng = random.Random(7)
+        for trial in range(30):
+            candidates, compatibility = random_catalog(rng, per_type=6)
+            budget = float(rng.randint(25, 45) * 10000)
+            views = {type_: TypeIndex(items).affordable(budget) for type_, items in candidates.items()}
+            try:
+                expected = solve_builds(candidates, budget, None, compatibility, 5)
+            except BuildInfeasibleError:
+                self.assertRaises(BuildInfeasibleError, solve_builds, views, budget, None, compatibility, 5)
+                continue
+            got = solve_builds(views, budget, None, compatibility, 5)
+            self.assertEqual([(sorted(c.id for c in build.values()), total) for build, total in got],
+                             [(sorted(c.id for c in build.values()), total) for build, total in expected],
+                             f"trial {trial}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""버전 디렉터리 게시(이름 충돌, CURRENT 교체, 오래된 버전 정리) 테스트
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from versioned_store import stage_version, publish_version, current_version, KEEP_VERSIONS
+
+
+class VersionedStoreTest(unittest.TestCase):
+
+    def publish(self, root, content):
+        version, staging = stage_version(root)
+        with open(os.path.join(staging, 'data'), 'w') as f:
+            f.write(content)
+        publish_version(root, version, staging)
+        return version
+
+    def test_same_instant_publishes_get_distinct_versions(self):
+        with tempfile.TemporaryDirectory() as root:
+            # 같은 밀리초 안에 게시해도 앞 버전을 덮어쓰지 않는다
+            versions = [self.publish(root, str(i)) for i in range(KEEP_VERSIONS)]
+            self.assertEqual(len(set(versions)), KEEP_VERSIONS)
+            self.assertEqual(current_version(root), versions[-1])
+            for i, version in enumerate(versions):
+                with open(os.path.join(root, version, 'data')) as f:
+                    self.assertEqual(f.read(), str(i))
+
+    def test_prunes_old_versions_but_not_other_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(root, exist_ok=True)
+            with open(os.path.join(root, 'HEARTBEAT'), 'w'):
+                pass
+            versions = [self.publish(root, str(i)) for i in range(KEEP_VERSIONS + 2)]
+            remaining = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+            self.assertEqual(remaining, versions[-KEEP_VERSIONS:])
+            self.assertTrue(os.path.exists(os.path.join(root, 'HEARTBEAT')))
+            self.assertEqual(current_version(root), versions[-1])
+
+    def test_no_current_version(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.assertIsNone(current_version(root))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+"""예산 구간별 추천 조합을 미리 계산해 둔 표
+
+예산 격자(TIER_START부터 TIER_STEP 간격으로 TIER_STOP까지)의 각 예산에 대해
+추천 파이프라인(후보 조합 생성 → 모델 순위)을 미리 돌려 상위 TIER_TOP_K개
+조합의 부품 ID만 배열로 저장한다. 서비스는 요청 예산 이하의 가장 가까운
+구간을 나눗셈 한 번으로 찾아 답하므로, 조합의 총 가격은 항상 예산 이하이다.
+
+표에는 만들 때의 모델 버전과 카탈로그 내용 해시(Snapshot.digest)가 함께
+저장된다. catalog_versions는 스크래퍼 loader를 거치지 않은 변경을 모르므로
+쓰지 않는다. 표는 서비스
+작업 프로세스 밖에서 만든다. --watch로 실행하면 카탈로그가 갱신되거나 모델이
+바뀔 때마다 다시 만들어 저장하고(gunicorn.conf.py가 실행), 서비스는 저장된
+파일이 바뀌었는지만 확인해 다시 읽는다.
+
+    python tiers.py --start 300000 --stop 10000000 --step 10000
+    python tiers.py --watch
+"""
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from catalog import COMPONENT_TYPES
+
+# 모델 저장소(models/)는 버전 디렉터리만 두므로 따로 둔다
+TIER_PATH = os.path.join('tiers', 'tiers.npz')
+TIER_START = 300000  # 원
+TIER_STOP = 10000000  # 원
+TIER_STEP = 10000  # 원
+TIER_TOP_K = 3  # 구간마다 저장하는 조합 수
+TIER_CHECK_INTERVAL = 10  # 서비스가 표 파일이 바뀌었는지 확인하는 주기 (초)
+TIER_WATCH_INTERVAL = 30  # --watch가 카탈로그와 모델 버전을 확인하는 주기 (초)
+
+MISSING_ID = -1  # 조합을 만들 수 없는 구간/순위
+
+
+class TierTable:
+    """구간별 상위 조합 표
+
+    ids: (구간 수, top_k, 타입 수) 부품 ID, totals/scores: (구간 수, top_k)
+    점수가 없는(폴백) 조합의 점수는 NaN, 조합이 없으면 ID가 MISSING_ID이다.
+    """
+
+    def __init__(self, start, step, ids, totals, scores, model_version=None, catalog_digest=None):
+        self.start = start
+        self.step = step
+        self.ids = ids
+        self.totals = totals
+        self.scores = scores
+        self.model_version = model_version
+        self.catalog_digest = catalog_digest
+
+    @property
+    def stop(self):
+        return self.start + self.step * (len(self.ids) - 1)
+
+    def tier_index(self, budget):
+        """budget 이하의 가장 가까운 구간 번호 (표 범위 밖이면 None)"""
+        if budget < self.start or budget >= self.stop + self.step:
+            return None
+        return int((budget - self.start) // self.step)
+
+    def lookup(self, budget, top_k=1):
+        """budget에 해당하는 구간의 조합을 [({타입: 부품 ID}, 총 가격, 점수), ...]로 반환
+
+        구간이 없거나 조합을 만들 수 없는 구간이면 빈 목록.
+        """
+        index = self.tier_index(budget)
+        if index is None:
+            return []
+        results = []
+        for rank in range(min(top_k, self.ids.shape[1])):
+            row = self.ids[index, rank]
+            if row[0] == MISSING_ID:
+                break
+            score = float(self.scores[index, rank])
+            results.append((dict(zip(COMPONENT_TYPES, (int(i) for i in row))), float(self.totals[index, rank]),
+                            None if np.isnan(score) else score))
+        return results
+
+    def save(self, path=TIER_PATH):
+        """표를 원자적으로 저장 (임시 파일에 쓴 뒤 이름 변경)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        meta = {"start": self.start, "step": self.step, "model_version": self.model_version,
+                "catalog_digest": self.catalog_digest}
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, ids=self.ids, totals=self.totals, scores=self.scores, meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=TIER_PATH):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta["start"], meta["step"], data['ids'], data['totals'], data['scores'],
+                       meta["model_version"], meta.get("catalog_digest"))
+
+
+def build_tier_table(recommend, start=TIER_START, stop=TIER_STOP, step=TIER_STEP, top_k=TIER_TOP_K,
+                     model_version=None, catalog_digest=None):
+    """예산 격자의 각 예산에 recommend(budget, top_k)를 실행해 표를 만듦
+
+    recommend는 [({타입: Component}, 총 가격, 점수), ...]를 반환하고, 조합이
+    불가능하면 ValueError(BuildInfeasibleError)를 발생시킨다.
+    """
+    budgets = np.arange(start, stop + 1, step)
+    ids = np.full((len(budgets), top_k, len(COMPONENT_TYPES)), MISSING_ID, dtype=np.int64)
+    totals = np.zeros((len(budgets), top_k))
+    scores = np.full((len(budgets), top_k), np.nan)
+    for index, budget in enumerate(budgets):
+        try:
+            ranked = recommend(float(budget), top_k)
+        except ValueError:
+            continue
+        for rank, (build, total_price, score) in enumerate(ranked[:top_k]):
+            ids[index, rank] = [build[component].id for component in COMPONENT_TYPES]
+            totals[index, rank] = total_price
+            if score is not None:
+                scores[index, rank] = score
+    return TierTable(start, step, ids, totals, scores, model_version, catalog_digest)
+
+
+class TierStore:
+    """서비스가 쓰는 현재 구간 표
+
+    표를 만들지는 않고, check_interval(초)마다 파일의 수정 시각을 확인해
+    바뀌었으면(watch가 새로 저장했으면) 다시 읽는다.
+    """
+
+    def __init__(self, path=TIER_PATH, check_interval=TIER_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._table = None
+        self._mtime = None
+        self._checked = 0.0
+
+    def load(self):
+        """저장된 표를 읽음 (없으면 None)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            table = TierTable.load(self.path)
+        except FileNotFoundError:
+            return None
+        self._table, self._mtime = table, mtime
+        logging.info(f"Tier table loaded: {len(table.ids)} tiers, model {table.model_version}")
+        return table
+
+    def get(self):
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            try:
+                if os.path.getmtime(self.path) != self._mtime:
+                    self.load()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.error(f"Tier table reload failed: {e}")
+        return self._table
+
+
+def watch(refresh, builder, is_fresh, path=TIER_PATH, interval=TIER_WATCH_INTERVAL):
+    """interval마다 refresh()로 카탈로그를 갱신하고, 저장된 표가 is_fresh(표)가 아니면 builder()로 다시 만들어 저장"""
+    table = None
+    while True:
+        try:
+            refresh()
+            if table is None and os.path.exists(path):
+                table = TierTable.load(path)
+            if table is None or not is_fresh(table):
+                start = time.perf_counter()
+                table = builder()
+                table.save(path)
+                logging.info(f"Tier table rebuilt: {len(table.ids)} tiers in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            logging.error(f"Tier table rebuild failed: {e}")
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="예산 구간별 추천 조합 표 생성")
+    parser.add_argument('--start', type=int, default=TIER_START, help="첫 구간 예산 (원)")
+    parser.add_argument('--stop', type=int, default=TIER_STOP, help="마지막 구간 예산 (원)")
+    parser.add_argument('--step', type=int, default=TIER_STEP, help="구간 간격 (원)")
+    parser.add_argument('--top-k', type=int, default=TIER_TOP_K, help="구간마다 저장할 조합 수")
+    parser.add_argument('--output', default=TIER_PATH, help="저장할 파일")
+    parser.add_argument('--watch', action='store_true', help="종료하지 않고 카탈로그나 모델이 바뀔 때마다 다시 만듦")
+    parser.add_argument('--interval', type=int, default=TIER_WATCH_INTERVAL, help="변경 확인 주기 (초)")
+    args = parser.parse_args()
+
+    import app
+
+    app.catalog.stop_auto_refresh()
+    if args.watch:
+        logging.getLogger().setLevel(logging.INFO)
+        watch(app.catalog.refresh_changed,
+              lambda: app.build_tiers(args.start, args.stop, args.step, args.top_k),
+              app.tiers_fresh, args.output, args.interval)
+    start = time.perf_counter()
+    table = app.build_tiers(args.start, args.stop, args.step, args.top_k)
+    table.save(args.output)
+    print(f"구간 표 저장 완료: {len(table.ids)}개 구간, {time.perf_counter() - start:.1f}초, {args.output}")
@@ -1,52 +1,270 @@
-import pandas as pd
-import sqlalchemy
+import numpy as np
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
-import pickle
+import argparse
+import itertools
 import json
+import os
+import shutil
+from catalog import COMPONENT_TYPES
+from db import get_db_connection, QUOTES_AFTER_QUERY, QUOTES_BY_ID_QUERY
+from model_store import ForestModel, CooccurrenceModel, publish_model
 
-# 데이터베이스 연결 설정
-# DATABASE_URL = 개인정보
-DATABASE_URL = "postgresql://<user>:<password>@<host>/<database>"
-engine = sqlalchemy.create_engine(DATABASE_URL)
+# 증분 학습 상태 (워터마크, 인코딩된 학습 데이터, 라벨 목록, 포레스트, 동시 등장 횟수)
+STATE_DIR = 'training_state'
+CHUNK_SIZE = 5000  # 한 번에 읽을 견적 수
+NEW_TREES = 10  # 증분 학습마다 추가하는 트리 수
+MAX_TREES = 100  # 포레스트에 유지하는 최대 트리 수 (오래된 트리부터 제거)
+HISTORY_SAMPLE = 20000  # 새 트리 학습에 함께 쓰는 기존 견적의 최대 수
+# 워터마크 아래에서 아직 읽지 못한 quoteid를 다음 학습 때 다시 찾아보는 최대 수
+# (write-behind 저장은 작업 프로세스마다 미리 받은 ID 블록을 쓰므로 quoteid 순서대로 커밋되지 않는다)
+MAX_PENDING_IDS = 5000
 
-def get_db_connection():
-    """데이터베이스 연결을 생성하고 반환"""
-    return engine.connect()
+# 학습할 모델 종류
+#   cooccurrence  부품 쌍별 동시 등장 횟수 (크기가 부품 쌍 수에 비례, 기본)
+#   forest        견적마다 클래스가 하나인 랜덤 포레스트 (크기가 견적 수에 비례)
+MODEL_KINDS = ["cooccurrence", "forest"]
+DEFAULT_MODEL_KIND = "cooccurrence"
+
+MISSING_ID = -1  # 견적에 해당 부품이 없을 때의 값
+
+def iter_quote_chunks(after=0, chunk_size=CHUNK_SIZE):
+    """quoteid가 after보다 큰 견적을 서버 측 커서로 chunk_size개씩 읽어 반환
+
+    각 청크는 (quoteid 배열, 부품 ID 행렬)이며 행렬은 COMPONENT_TYPES 순서의
+    int64 컬럼으로 펼쳐진다. 한 번에 청크 하나만 메모리에 올라온다.
+    """
+    conn = get_db_connection().execution_options(stream_results=True, max_row_buffer=chunk_size)
+    result = conn.execute(QUOTES_AFTER_QUERY, {"after": after})
+    try:
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield flatten_quotes(rows)
+    finally:
+        conn.close()
+
+def load_quotes_by_id(quoteids, chunk_size=CHUNK_SIZE):
+    """지정한 quoteid 중 저장되어 있는 견적을 (quoteid 배열, 부품 ID 행렬)로 반환"""
+    rows = []
+    with get_db_connection() as conn:
+        for start in range(0, len(quoteids), chunk_size):
+            rows.extend(conn.execute(QUOTES_BY_ID_QUERY, {"ids": list(quoteids[start:start + chunk_size])}).fetchall())
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(COMPONENT_TYPES)), dtype=np.int64)
+    return flatten_quotes(rows)
+
+def pending_quoteids(pending, seen, old_watermark, watermark):
+    """이번에 읽지 못한 워터마크 이하의 quoteid (늦게 커밋될 수 있어 다음 학습 때 다시 찾는다)
+
+    기존 pending과 이전 워터마크~새 워터마크 사이의 빈 ID 중 읽은 것을 빼고,
+    가장 최근 MAX_PENDING_IDS개만 남긴다.
+    """
+    seen = np.concatenate(seen) if seen else np.zeros(0, dtype=np.int64)
+    gaps = np.arange(max(old_watermark + 1, watermark - MAX_PENDING_IDS), watermark, dtype=np.int64)
+    candidates = np.union1d(np.asarray(pending, dtype=np.int64), gaps)
+    return [int(quoteid) for quoteid in np.setdiff1d(candidates, seen)[-MAX_PENDING_IDS:]]
+
+def flatten_quotes(rows):
+    """(quoteid, components JSON) 목록을 (quoteid 배열, 부품 ID 행렬)로 변환"""
+    n = len(rows)
+    quoteids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=n)
+    decoded = [c if isinstance(c, dict) else json.loads(c) for _, c in rows]
+    ids = np.empty((n, len(COMPONENT_TYPES)), dtype=np.int64)
+    for j, component in enumerate(COMPONENT_TYPES):
+        ids[:, j] = np.fromiter((_component_id(d.get(component)) for d in decoded), dtype=np.int64, count=n)
+    return quoteids, ids
+
+def _component_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return MISSING_ID
+
+def component_label(componentid):
+    """부품 ID를 라벨 인코더의 라벨 문자열로 변환"""
+    return 'nan' if componentid == MISSING_ID else str(componentid)
 
 def load_data():
-    """데이터베이스에서 확정된 견적 데이터를 불러와서 DataFrame으로 반환"""
-    conn = get_db_connection()
-    query = "SELECT * FROM confirmed_quotes"
-    df = pd.read_sql(query, conn)  # 확정된 견적 데이터를 DataFrame으로 로드
-    conn.close()
-    return df
-
-def train_model():
+    """데이터베이스에서 확정된 견적을 청크 단위로 불러와 (quoteid 배열, 부품 ID 행렬)로 반환"""
+    chunks = list(iter_quote_chunks())
+    if not chunks:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(COMPONENT_TYPES)), dtype=np.int64)
+    quoteids = np.concatenate([quoteids for quoteids, _ in chunks])
+    ids = np.concatenate([ids for _, ids in chunks])
+    return quoteids, ids
+
+def train_model(kind=DEFAULT_MODEL_KIND):
     """확정된 견적 데이터를 이용하여 AI 모델을 학습하고 저장"""
-    df = load_data()  # 데이터 로드
-    # JSON 형식의 부품 데이터를 개별 컬럼으로 변환
-    df['components'] = df['components'].apply(json.loads)
-    components_df = df['components'].apply(pd.Series)
+    quoteids, ids = load_data()  # 데이터 로드
 
     # 각 부품의 ID를 레이블 인코딩
+    X = np.empty(ids.shape, dtype=np.int32)
     le_dict = {}
-    for column in components_df.columns:
+    for j, component in enumerate(COMPONENT_TYPES):
         le = LabelEncoder()
-        components_df[column] = le.fit_transform(components_df[column].astype(str))
-        le_dict[column] = le
+        X[:, j] = le.fit_transform(ids[:, j])
+        le_dict[component] = [component_label(componentid) for componentid in le.classes_]
+
+    if kind == "cooccurrence":
+        model = CooccurrenceModel.fit(X, [len(le_dict[component]) for component in COMPONENT_TYPES])
+    else:
+        # 타겟 변수 (각 견적의 인덱스를 타겟으로 사용)
+        y = np.arange(len(quoteids))
+
+        # 랜덤 포레스트 모델 학습
+        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model.fit(X, y)
+
+    # 학습된 모델과 라벨 인코더를 모델 저장소에 새 버전으로 게시 (서비스가 자동으로 교체)
+    version = publish_model(model, le_dict)
+    print(f"모델 게시 완료: {version}")
+
+def load_state():
+    """증분 학습 상태를 불러옴 (없으면 빈 상태)"""
+    path = os.path.join(STATE_DIR, 'state.json')
+    if not os.path.exists(path):
+        return {
+            "watermark": 0,
+            "pending": [],
+            "labels": {component: [] for component in COMPONENT_TYPES},
+            "X": np.zeros((0, len(COMPONENT_TYPES)), dtype=np.int32),
+            "forest": None,
+            "cooccurrence": None,
+            "cooccurrence_rows": 0,
+        }
+    with open(path) as f:
+        state = json.load(f)
+    state.setdefault("pending", [])
+    # state.json이 마지막에 쓰이므로 그보다 많이 저장된 행은 버린다
+    state["X"] = np.load(os.path.join(STATE_DIR, 'X.npy'))[:state["rows"]]
+    forest_dir = os.path.join(STATE_DIR, 'forest')
+    state["forest"] = ForestModel.load(forest_dir, mmap_mode=None) if os.path.isdir(forest_dir) else None
+    # 동시 등장 횟수는 X의 앞 cooccurrence_rows개 행까지 센 것이다
+    cooccurrence_dir = os.path.join(STATE_DIR, 'cooccurrence')
+    state.setdefault("cooccurrence_rows", 0)
+    state["cooccurrence"] = None
+    if state["cooccurrence_rows"] and os.path.isdir(cooccurrence_dir):
+        state["cooccurrence"] = CooccurrenceModel.load(cooccurrence_dir, mmap_mode=None)
+    return state
+
+def _save_model_dir(model, name):
+    """모델을 STATE_DIR/name에 저장 (임시 디렉터리에 쓴 뒤 교체)"""
+    path = os.path.join(STATE_DIR, name)
+    shutil.rmtree(path + '.tmp', ignore_errors=True)
+    os.makedirs(path + '.tmp')
+    model.save(path + '.tmp')
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(path + '.tmp', path)
+
+def save_state(state, forest=None, cooccurrence=None):
+    """증분 학습 상태를 저장 (state.json을 마지막에 원자적으로 교체)
+
+    forest나 cooccurrence가 None이면 저장된 것을 그대로 둔다.
+    """
+    os.makedirs(STATE_DIR, exist_ok=True)
+    np.save(os.path.join(STATE_DIR, 'X.tmp.npy'), state["X"])
+    os.replace(os.path.join(STATE_DIR, 'X.tmp.npy'), os.path.join(STATE_DIR, 'X.npy'))
+
+    if forest is not None:
+        _save_model_dir(forest, 'forest')
+    if cooccurrence is not None:
+        _save_model_dir(cooccurrence, 'cooccurrence')
+
+    meta = {"watermark": state["watermark"], "pending": state["pending"], "rows": len(state["X"]),
+            "labels": state["labels"], "cooccurrence_rows": state["cooccurrence_rows"]}
+    with open(os.path.join(STATE_DIR, 'state.json.tmp'), 'w') as f:
+        json.dump(meta, f)
+    os.replace(os.path.join(STATE_DIR, 'state.json.tmp'), os.path.join(STATE_DIR, 'state.json'))
+
+def encode_quotes(ids, labels):
+    """부품 ID 행렬을 라벨 코드 행렬로 변환. 처음 보는 부품 ID는 라벨 목록 끝에 추가"""
+    X = np.empty(ids.shape, dtype=np.int32)
+    for j, component in enumerate(COMPONENT_TYPES):
+        codes = {label: code for code, label in enumerate(labels[component])}
+        unique, inverse = np.unique(ids[:, j], return_inverse=True)
+        mapped = np.empty(len(unique), dtype=np.int32)
+        for k, componentid in enumerate(unique):
+            label = component_label(componentid)
+            code = codes.get(label)
+            if code is None:
+                code = codes[label] = len(labels[component])
+                labels[component].append(label)
+            mapped[k] = code
+        X[:, j] = mapped[inverse]
+    return X
+
+def train_incremental(kind=DEFAULT_MODEL_KIND):
+    """마지막 학습 이후 새로 확정된 견적만 읽어 모델을 갱신하고 게시
+
+    기존 라벨 코드는 바뀌지 않으므로 기존 트리는 그대로 두고, 새 견적과
+    기존 견적 일부로 학습한 NEW_TREES개의 트리를 포레스트에 추가한다
+    (warm start). 포레스트는 최근 MAX_TREES개의 트리만 유지한다.
+    동시 등장 모델은 저장해 둔 횟수에 아직 세지 않은 행(새 견적)의 횟수만 더한다.
+
+    워터마크 아래에서 지난번에 비어 있던 quoteid(늦게 커밋된 견적)도 함께 읽는다.
+    """
+    state = load_state()
+    new_X = []
+    seen = []
+    old_watermark = state["watermark"]
+    chunks = [load_quotes_by_id(state["pending"])] if state["pending"] else []
+    for quoteids, ids in itertools.chain(chunks, iter_quote_chunks(old_watermark)):
+        if not len(quoteids):
+            continue
+        new_X.append(encode_quotes(ids, state["labels"]))
+        seen.append(quoteids)
+        state["watermark"] = max(state["watermark"], int(quoteids[-1]))
+    state["pending"] = pending_quoteids(state["pending"], seen, old_watermark, state["watermark"])
+    if not new_X:
+        print("새로 확정된 견적이 없습니다.")
+        return
+
+    old_rows = len(state["X"])
+    new_X = np.concatenate(new_X)
+    state["X"] = np.concatenate([state["X"], new_X])
+
+    if kind == "cooccurrence":
+        slot_sizes = [len(state["labels"][component]) for component in COMPONENT_TYPES]
+        previous = state["cooccurrence"]
+        if previous is None:
+            # 처음이면(또는 포레스트만 학습해 왔으면) 누적된 X 전체로 센다
+            model = CooccurrenceModel.fit(state["X"], slot_sizes)
+        else:
+            model = previous.update(state["X"][state["cooccurrence_rows"]:], slot_sizes)
+        state["cooccurrence_rows"] = len(state["X"])
+        save_state(state, cooccurrence=model)
+        version = publish_model(model, state["labels"])
+        print(f"증분 학습 완료: 새 견적 {len(new_X)}개, 부품 쌍 {len(model.pair_keys)}개, 모델 {version}")
+        return
+    # 타겟은 전체 학습 데이터에서 견적의 순번 (train_model의 df.index와 같은 의미)
+    new_y = np.arange(old_rows, len(state["X"]))
 
-    # 특징과 타겟 변수 설정
-    X = components_df.values  # 특징 행렬
-    y = df.index  # 타겟 변수 (각 견적의 인덱스를 타겟으로 사용)
+    previous = state["forest"]
+    rng = np.random.default_rng()
+    history = rng.choice(old_rows, size=min(old_rows, HISTORY_SAMPLE), replace=False)
+    X = np.concatenate([state["X"][history], new_X])
+    y = np.concatenate([history, new_y])
 
-    # 랜덤 포레스트 모델 학습
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model = RandomForestClassifier(n_estimators=NEW_TREES if previous is not None else MAX_TREES)
     model.fit(X, y)
+    classes = np.arange(len(state["X"]))
+    forest = ForestModel.from_sklearn(model).with_classes(classes)
+    if previous is not None:
+        forest = ForestModel.concat([previous.with_classes(classes), forest])
+        forest = forest.trees(max(0, forest.n_trees - MAX_TREES))
 
-    # 학습된 모델과 라벨 인코더 딕셔너리를 파일로 저장
-    with open('pc_build_model.pkl', 'wb') as f:
-        pickle.dump((model, le_dict), f)
+    save_state(state, forest=forest)
+    version = publish_model(forest, state["labels"])
+    print(f"증분 학습 완료: 새 견적 {len(new_X)}개, 트리 {forest.n_trees}개, 모델 {version}")
 
 if __name__ == "__main__":
-    train_model()  # 메인 함수 실행
+    parser = argparse.ArgumentParser(description="확정된 견적으로 추천 모델 학습")
+    parser.add_argument('--incremental', action='store_true', help="새로 확정된 견적만 읽어 기존 모델을 갱신")
+    parser.add_argument('--kind', choices=MODEL_KINDS, default=DEFAULT_MODEL_KIND, help="학습할 모델 종류")
+    args = parser.parse_args()
+    if args.incremental:
+        train_incremental(args.kind)
+    else:
+        train_model(args.kind)  # 메인 함수 실행
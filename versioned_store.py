@@ -0,0 +1,61 @@
+"""버전 디렉터리 저장소 (모델 저장소와 공유 카탈로그가 함께 씀)
+
+게시할 때마다 새 버전 이름의 임시 디렉터리에 모두 쓴 뒤 이름을 바꾸고, 현재
+버전을 적은 CURRENT 파일을 원자적으로 교체한다. 읽는 쪽은 CURRENT만 보므로
+절반만 쓰인 버전을 읽지 않고, 오래된 버전은 최근 KEEP_VERSIONS개만 남긴다.
+
+    version, staging = stage_version(root)
+    ...  # staging에 파일을 씀
+    publish_version(root, version, staging)
+"""
+import os
+import shutil
+import time
+
+CURRENT_FILE = 'CURRENT'
+KEEP_VERSIONS = 3
+
+
+def stage_version(root):
+    """새 버전 이름과 그 버전을 쓸 임시 디렉터리를 만들어 (버전, 임시 디렉터리)를 반환
+
+    이름은 게시 시각(밀리초)과 프로세스 ID이고, 같은 이름이 이미 있으면 뒤에 '_'를 붙인다.
+    """
+    os.makedirs(root, exist_ok=True)
+    now = time.time()
+    version = time.strftime('%Y%m%d%H%M%S', time.localtime(now)) + f'{int(now * 1000) % 1000:03d}-{os.getpid()}'
+    while os.path.exists(os.path.join(root, version)) or os.path.exists(os.path.join(root, f'.tmp-{version}')):
+        version += '_'
+    staging = os.path.join(root, f'.tmp-{version}')
+    os.makedirs(staging)
+    return version, staging
+
+
+def publish_version(root, version, staging, keep=KEEP_VERSIONS):
+    """다 쓴 임시 디렉터리를 버전 디렉터리로 옮기고 CURRENT를 그 버전으로 교체"""
+    os.rename(staging, os.path.join(root, version))
+    current_tmp = os.path.join(root, f'{CURRENT_FILE}.tmp')
+    with open(current_tmp, 'w') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+    _prune_versions(root, version, keep)
+
+
+def current_version(root):
+    """CURRENT가 가리키는 버전 (게시된 버전이 없으면 None)"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _prune_versions(root, current, keep):
+    versions = sorted(name for name in os.listdir(root)
+                      if not name.startswith('.') and os.path.isdir(os.path.join(root, name)))
+    for name in versions[:-keep]:
+        if name != current:
+            # 이미 mmap으로 열린 파일은 삭제 후에도 해당 프로세스에서 계속 유효하다
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)